@@ -0,0 +1,132 @@
+"""
+Sales analytics as server-side MongoDB aggregation pipelines
+"""
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+from singleflight import SingleFlight
+
+BUCKET_FORMATS = {"day": "%Y-%m-%d", "hour": "%Y-%m-%dT%H:00"}
+# Best-seller category for items sold before categories were snapshotted and since deleted
+UNKNOWN_CATEGORY = "unknown"
+
+
+def created_at_range(date_from, date_to, tz):
+    """$match on created_at (naive UTC) covering local business days date_from..date_to"""
+    def to_utc(day):
+        local = datetime.combine(day, dt_time.min, tzinfo=tz)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+    return {"created_at": {"$gte": to_utc(date_from), "$lt": to_utc(date_to + timedelta(days=1))}}
+
+
+def revenue_pipeline(match, granularity, tz):
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"$dateToString": {
+                "format": BUCKET_FORMATS[granularity], "date": "$created_at", "timezone": tz.key
+            }},
+            "revenue": {"$sum": "$total_amount"},
+            "order_count": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "bucket": "$_id", "revenue": 1, "order_count": 1}},
+    ]
+
+
+def best_sellers_pipeline(match, limit, category=None):
+    pipeline = [
+        {"$match": match},
+        {"$unwind": "$items"},
+        {"$group": {
+            "_id": "$items.menu_item_id",
+            "quantity": {"$sum": "$items.quantity"},
+            "revenue": {"$sum": {"$ifNull": ["$items.line_total", 0]}},
+            "name": {"$last": "$items.name"},
+            "category": {"$last": "$items.category"},
+        }},
+        # One lookup per distinct item, not per order line; only older orders
+        # lack the category snapshot, and deleted items keep their sales
+        {"$lookup": {
+            "from": "menu_items",
+            "localField": "_id",
+            "foreignField": "id",
+            "as": "menu_item",
+        }},
+        {"$unwind": {"path": "$menu_item", "preserveNullAndEmptyArrays": True}},
+        {"$addFields": {
+            "category": {"$ifNull": ["$category", {"$ifNull": ["$menu_item.category", UNKNOWN_CATEGORY]}]},
+        }},
+    ]
+    if category:
+        pipeline.append({"$match": {"category": category}})
+    pipeline += [
+        {"$sort": {"quantity": -1, "revenue": -1}},
+        {"$group": {
+            "_id": "$category",
+            "items": {"$push": {
+                "menu_item_id": "$_id",
+                "name": {"$ifNull": ["$menu_item.name", "$name"]},
+                "quantity": "$quantity",
+                "revenue": "$revenue",
+            }},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "category": "$_id", "items": {"$slice": ["$items", limit]}}},
+    ]
+    return pipeline
+
+
+def ticket_size_pipeline(match):
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": "$order_type",
+            "order_count": {"$sum": 1},
+            "revenue": {"$sum": "$total_amount"},
+            "average_ticket": {"$avg": "$total_amount"},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "order_type": "$_id",
+            "order_count": 1,
+            "revenue": 1,
+            "average_ticket": 1,
+        }},
+    ]
+
+
+def round_amounts(rows):
+    """Round money fields in report rows (and nested item lists) to 2 places"""
+    for row in rows:
+        for field in ("revenue", "average_ticket"):
+            if row.get(field) is not None:
+                row[field] = round(row[field], 2)
+        round_amounts(row.get("items", ()))
+    return rows
+
+
+class ResultCache:
+    """Short-lived cache for report results; concurrent misses share one query"""
+
+    def __init__(self, ttl=60.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results = {}
+        self._flight = SingleFlight("analytics")
+
+    async def get(self, key, compute):
+        cached = self._results.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        async def run():
+            result = await compute()
+            if len(self._results) >= self.max_entries:
+                now = time.monotonic()
+                self._results = {k: v for k, v in self._results.items() if v[0] > now}
+            self._results[key] = (time.monotonic() + self.ttl, result)
+            return result
+
+        return await self._flight.do(key, run)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Load-testing benchmark for the restaurant API
+
+Runs server.py's app in-process against an in-memory MongoDB stand-in
+(mongomock-motor) and drives a weighted mix of menu reads, order creates
+and order lists at a fixed concurrency.
+
+    python benchmark.py --concurrency 50 --requests 5000 --save before.json
+    python benchmark.py --concurrency 50 --requests 5000 --compare before.json
+
+--read-path instead measures the CPU time per large GET /api/orders page
+with pydantic re-validation (LEAN_READS off) versus the lean read path.
+The page is fetched once and served from memory, so the numbers cover the
+handler and serialization, not mongomock.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+# Every simulated customer shares the one in-process client address
+os.environ.setdefault('ORDER_IP_RATE_LIMIT', '0')
+# Seeded orders are never completed, so the kitchen backlog only grows
+os.environ.setdefault('CATERING_MAX_BACKLOG_MINUTES', '0')
+
+import httpx
+
+try:
+    import mongomock_motor
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    sys.exit("benchmark.py needs mongomock-motor: pip install mongomock-motor")
+
+import server
+from metrics import InstrumentedDatabase
+
+# Per-request access logs would dominate the measurement
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+CATEGORIES = ["appetizers", "main_course", "breads", "rice", "beverages", "desserts", "snacks"]
+INGREDIENTS = ["Paneer", "Rice", "Milk", "Potato", "Spices", "Onions", "Tomato", "Butter", "Lentils", "Peas"]
+
+# (name, weight) - roughly a lunch-rush storefront plus a polling kitchen display
+SCENARIO = [
+    ("GET /api/menu", 40),
+    ("GET /api/menu/category/{category}", 20),
+    ("GET /api/menu/search", 10),
+    ("POST /api/orders", 15),
+    ("GET /api/orders", 10),
+    ("GET /api/orders/{order_id}", 5),
+]
+
+
+def add_db_latency(latency_ms):
+    """
+    Make every mongomock call await a network-like delay.
+
+    mongomock never yields to the event loop, which would make concurrent
+    requests look strictly sequential; real Motor calls always do.
+    """
+    if latency_ms <= 0:
+        return
+
+    def delayed(method):
+        async def wrapper(*args, **kwargs):
+            await asyncio.sleep(latency_ms / 1000)
+            return await method(*args, **kwargs)
+        return wrapper
+
+    targets = [(mongomock_motor.AsyncMongoMockCollection, None), (mongomock_motor.AsyncCursor, {"to_list"})]
+    for cls, names in targets:
+        for name in dir(cls):
+            if names is not None and name not in names:
+                continue
+            if not name.startswith("_") and inspect.iscoroutinefunction(getattr(cls, name)):
+                setattr(cls, name, delayed(getattr(cls, name)))
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Workload:
+    def __init__(self, client, menu_ids, seed):
+        self.client = client
+        self.menu_ids = menu_ids
+        self.order_ids = []
+        self.random = random.Random(seed)
+
+    async def run(self, name):
+        rnd = self.random
+        if name == "GET /api/menu":
+            return await self.client.get("/api/menu")
+        if name == "GET /api/menu/category/{category}":
+            return await self.client.get(f"/api/menu/category/{rnd.choice(CATEGORIES)}")
+        if name == "GET /api/menu/search":
+            return await self.client.get("/api/menu/search", params={"q": rnd.choice(INGREDIENTS)[:4]})
+        if name == "POST /api/orders":
+            lines = rnd.randint(1, 20) if rnd.random() < 0.1 else rnd.randint(1, 4)
+            order = {
+                "customer_name": "Benchmark Customer",
+                "customer_phone": f"+91-{rnd.randint(7000000000, 9999999999)}",
+                "order_type": rnd.choice(["takeout", "delivery", "catering"]),
+                "items": [
+                    {"menu_item_id": rnd.choice(self.menu_ids), "quantity": rnd.randint(1, 3)}
+                    for _ in range(lines)
+                ],
+            }
+            response = await self.client.post("/api/orders", json=order)
+            if response.status_code == 200:
+                self.order_ids.append(response.json()["id"])
+            return response
+        if name == "GET /api/orders":
+            return await self.client.get("/api/orders", params={"limit": 50})
+        if name == "GET /api/orders/{order_id}":
+            order_id = rnd.choice(self.order_ids) if self.order_ids else "missing"
+            return await self.client.get(f"/api/orders/{order_id}")
+        raise ValueError(name)
+
+
+async def seed(client, menu_size, order_count, rnd):
+    items = [
+        {
+            "id": f"bench-{i:04d}",
+            "name": f"{rnd.choice(INGREDIENTS)} {rnd.choice(['Masala', 'Tikka', 'Curry', 'Special'])} {i}",
+            "description": "Benchmark dish " + " ".join(rnd.sample(INGREDIENTS, 4)),
+            "price": float(rnd.randint(20, 400)),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "is_spicy": rnd.random() < 0.4,
+            "preparation_time": rnd.randint(5, 30),
+            "ingredients": rnd.sample(INGREDIENTS, 3),
+        }
+        for i in range(menu_size)
+    ]
+    response = await client.post("/api/menu/bulk", json={"items": items})
+    response.raise_for_status()
+    menu_ids = response.json()["ids"]
+
+    workload = Workload(client, menu_ids, rnd.random())
+    for _ in range(order_count):
+        await workload.run("POST /api/orders")
+    return workload
+
+
+async def run_benchmark(args):
+    add_db_latency(args.db_latency_ms)
+    server.use_database(InstrumentedDatabase(AsyncMongoMockClient()[os.environ['DB_NAME']]))
+    rnd = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        workload = await seed(client, args.menu_size, args.seed_orders, rnd)
+
+        names = [name for name, _ in SCENARIO]
+        weights = [weight for _, weight in SCENARIO]
+        plan = rnd.choices(names, weights=weights, k=args.requests)
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        queue = iter(plan)
+
+        async def worker():
+            for name in queue:
+                start = time.perf_counter()
+                response = await workload.run(name)
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400 and not (
+                    name == "GET /api/orders/{order_id}" and response.status_code == 404
+                ):
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "menu_size": args.menu_size,
+            "seed_orders": args.seed_orders,
+            "seed": args.seed,
+            "db_latency_ms": args.db_latency_ms,
+        },
+        "elapsed_s": elapsed,
+        "throughput_rps": args.requests / elapsed,
+        "endpoints": {},
+    }
+    for name in names:
+        samples = latencies[name]
+        if not samples:
+            continue
+        results["endpoints"][name] = {
+            "count": len(samples),
+            "errors": errors[name],
+            "mean_ms": statistics.fmean(samples),
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "throughput_rps": len(samples) / elapsed,
+        }
+    return results
+
+
+class PrefetchedCursor:
+    """Stands in for a Motor cursor over documents that are already in memory"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, count):
+        return PrefetchedCursor(self.documents[:count])
+
+    async def to_list(self, length):
+        return list(self.documents[:length])
+
+
+class PrefetchedOrders:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, *args, **kwargs):
+        return PrefetchedCursor(self.documents)
+
+
+async def run_read_path_benchmark(args):
+    """CPU seconds per GET /api/orders page, validated vs lean"""
+    server.use_database(AsyncMongoMockClient()[os.environ['DB_NAME']])
+    rnd = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await seed(client, args.menu_size, args.seed_orders, rnd)
+        page_size = min(args.seed_orders, server.ORDERS_MAX_PAGE_SIZE)
+        seeded_db = server.db
+        results = {}
+        try:
+            for lean in (False, True):
+                server.LEAN_READS = lean
+                # Fetch the page once, with the projection the mode uses, and serve it
+                # from memory so only the handler and serialization are timed
+                projection = server.LEAN_ORDER.projection if lean else {"_id": 0}
+                documents = await seeded_db.orders.find({}, projection).sort(
+                    [("created_at", -1), ("id", -1)]
+                ).to_list(page_size + 1)
+                server.db = SimpleNamespace(orders=PrefetchedOrders(documents))
+                await client.get("/api/orders", params={"limit": page_size})  # warm up
+                samples = []
+                for _ in range(args.repeat):
+                    cpu_started = time.process_time()
+                    response = await client.get("/api/orders", params={"limit": page_size})
+                    samples.append(time.process_time() - cpu_started)
+                    response.raise_for_status()
+                results["lean" if lean else "validated"] = statistics.median(samples)
+        finally:
+            server.db = seeded_db
+    return page_size, results
+
+
+def print_read_path_results(page_size, results):
+    validated, lean = results["validated"], results["lean"]
+    print(f"\nGET /api/orders?limit={page_size}: median CPU time per request, database excluded")
+    print(f"  validated (LEAN_READS=false): {validated * 1000:8.2f} ms")
+    print(f"  lean      (LEAN_READS=true):  {lean * 1000:8.2f} ms")
+    print(f"  saved: {(validated - lean) * 1000:.2f} ms per request ({(validated - lean) / validated * 100:.0f}%)")
+
+
+def print_results(results, baseline=None):
+    print(
+        f"\n{results['config']['requests']} requests @ concurrency {results['config']['concurrency']}: "
+        f"{results['elapsed_s']:.2f}s, {results['throughput_rps']:.1f} req/s"
+    )
+    if baseline:
+        print(f"  baseline: {baseline['throughput_rps']:.1f} req/s "
+              f"({_delta(results['throughput_rps'], baseline['throughput_rps'])})")
+    header = f"{'endpoint':<36} {'count':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:<36} {stats['count']:>6} {stats['errors']:>4} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['throughput_rps']:>8.1f}"
+        )
+        before = (baseline or {}).get("endpoints", {}).get(name)
+        if before:
+            print(
+                f"{'  vs baseline':<48} {_delta(stats['p50_ms'], before['p50_ms']):>9} "
+                f"{_delta(stats['p95_ms'], before['p95_ms']):>9} {_delta(stats['p99_ms'], before['p99_ms']):>9} "
+                f"{_delta(stats['throughput_rps'], before['throughput_rps']):>8}"
+            )
+
+
+def _delta(current, previous):
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--menu-size", type=int, default=60)
+    parser.add_argument("--seed-orders", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0,
+                        help="simulated round-trip time added to every database call")
+    parser.add_argument("--read-path", action="store_true",
+                        help="compare CPU per order-list request with and without LEAN_READS")
+    parser.add_argument("--repeat", type=int, default=20, help="requests per mode with --read-path")
+    parser.add_argument("--save", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON from an earlier --save")
+    args = parser.parse_args(argv)
+
+    if args.read_path:
+        print_read_path_results(*asyncio.run(run_read_path_benchmark(args)))
+        return
+    results = asyncio.run(run_benchmark(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
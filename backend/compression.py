@@ -0,0 +1,174 @@
+"""
+Response compression (Brotli when available, otherwise GZip)
+"""
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Already-compressed payloads are not worth compressing again, and
+# event streams must reach the client unbuffered
+SKIP_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream",
+)
+
+
+def preferred_encoding(accept_encoding):
+    """
+    Best encoding we support from an Accept-Encoding header, or None.
+
+    None also when the client explicitly ranks identity above every
+    encoding we could use.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    # Highest q wins; SUPPORTED_ENCODINGS order (and max's first-wins) breaks ties
+    best = max(
+        SUPPORTED_ENCODINGS, key=lambda encoding: accepted.get(encoding, accepted.get("*", 0.0))
+    )
+    quality = accepted.get(best, accepted.get("*", 0.0))
+    if quality <= 0 or accepted.get("identity", 0.0) > quality:
+        return None
+    return best
+
+
+def compress(body, encoding):
+    """One-shot compression at maximum ratio, for pre-compressed bodies"""
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def write(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=4)
+
+    def write(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+STREAMS = {"gzip": _GzipStream, "br": _BrotliStream}
+
+
+class CompressionMiddleware:
+    """
+    Like starlette's GZipMiddleware, but negotiates Brotli as well.
+
+    Responses that already set Content-Encoding (e.g. pre-compressed menu
+    bodies) and responses under `minimum_size` bytes are passed through.
+    """
+
+    def __init__(self, app, minimum_size=1000):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = preferred_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app, encoding, minimum_size):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send = None
+        self.initial_message = None
+        self.passthrough = False
+        self.started = False
+        self.stream = None
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until we know whether the body is compressed
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or content_type.startswith(SKIP_CONTENT_TYPES)
+            )
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            if not more_body and len(body) < self.minimum_size:
+                await self.send(self.initial_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            self.stream = STREAMS[self.encoding]()
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.stream.write(body)
+            else:
+                message["body"] = self.stream.write(body) + self.stream.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        data = self.stream.write(body)
+        if not more_body:
+            data += self.stream.finish()
+        message["body"] = data
+        await self.send(message)
@@ -0,0 +1,62 @@
+"""
+MongoDB client settings, read from the environment (.env)
+"""
+import os
+
+from pymongo import ReadPreference
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from pymongo.write_concern import WriteConcern
+
+
+def _int_env(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def client_options():
+    """Keyword arguments for AsyncIOMotorClient"""
+    options = {
+        "maxPoolSize": _int_env('MONGO_MAX_POOL_SIZE', 100),
+        "minPoolSize": _int_env('MONGO_MIN_POOL_SIZE', 0),
+        "serverSelectionTimeoutMS": _int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        "connectTimeoutMS": _int_env('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        "appname": os.environ.get('MONGO_APP_NAME', 'shriyansh-restaurant-api'),
+    }
+    # Unset means wait/run without limit, as in the driver defaults
+    wait_queue_timeout = _int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+    if wait_queue_timeout is not None:
+        options["waitQueueTimeoutMS"] = wait_queue_timeout
+    socket_timeout = _int_env('MONGO_SOCKET_TIMEOUT_MS')
+    if socket_timeout is not None:
+        options["socketTimeoutMS"] = socket_timeout
+    # e.g. "zstd,snappy,zlib"; zstd and snappy need their optional packages
+    compressors = os.environ.get('MONGO_COMPRESSORS')
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def orders_write_concern():
+    """Write concern for order (and other primary) writes"""
+    w = os.environ.get('ORDERS_WRITE_CONCERN', 'majority')
+    return WriteConcern(
+        w=int(w) if w.isdigit() else w,
+        j=os.environ.get('ORDERS_WRITE_JOURNAL', 'true').lower() == 'true',
+        wtimeout=_int_env('ORDERS_WRITE_TIMEOUT_MS', 5000),
+    )
+
+
+def menu_read_preference():
+    """
+    Read preference for menu reads, e.g. "secondaryPreferred".
+
+    Defaults to primary. Reloads right after a menu version bump always
+    read from the primary, so a secondary only serves the TTL refreshes.
+    Use MENU_MAX_STALENESS_SECONDS (>= 90) to bound how far behind a
+    secondary may be.
+    """
+    name = os.environ.get('MENU_READ_PREFERENCE', 'primary')
+    if name == 'primary':
+        return ReadPreference.PRIMARY
+    max_staleness = _int_env('MENU_MAX_STALENESS_SECONDS', -1)
+    return make_read_preference(read_pref_mode_from_name(name), None, max_staleness=max_staleness)
@@ -0,0 +1,88 @@
+"""
+Conditional GET helpers (ETag / If-None-Match / Cache-Control)
+"""
+import hashlib
+
+import orjson
+from starlette.responses import Response
+
+from compression import SUPPORTED_ENCODINGS, compress, preferred_encoding
+
+
+def make_etag(body):
+    """Strong ETag derived from the response bytes"""
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def encoded_etag(etag, encoding):
+    """ETag for the `encoding` content-coding of the representation tagged `etag`"""
+    if not encoding:
+        return etag
+    return '%s-%s"' % (etag[:-1], encoding)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Weak comparison as required for If-None-Match (RFC 9110 13.1.2).
+
+    Tags of any content-coding of `etag` match too: they are the same
+    content, so a client holding one need not download another.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etags = {etag, *(encoded_etag(etag, encoding) for encoding in SUPPORTED_ENCODINGS)}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class CachedBody:
+    """Pre-serialized JSON response body with its ETag and compressed variants"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = make_etag(body)
+        self._encoded = {}
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(orjson.dumps(data))
+
+    def encoded(self, encoding):
+        """Body compressed with `encoding`, compressed once on first use"""
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = compress(self.body, encoding)
+            self._encoded[encoding] = body
+        return body
+
+
+def cached_response(request, cached, cache_control, media_type="application/json",
+                    min_compress_size=1000):
+    """
+    Send `cached`, or 304 Not Modified if the client already has it.
+
+    Each content-coding gets its own strong ETag, since the bytes differ.
+    """
+    encoding = None
+    if len(cached.body) >= min_compress_size:
+        encoding = preferred_encoding(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": encoded_etag(cached.etag, encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+
+    body = cached.body
+    if encoding:
+        body = cached.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
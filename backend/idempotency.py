@@ -0,0 +1,153 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(payload):
+    """Stable hash of a request payload, to detect a key reused for another request"""
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Remembers the response produced for each Idempotency-Key.
+
+    Lookups go through an in-memory LRU first, then the Mongo collection
+    (whose TTL index expires keys). Concurrent duplicates within a worker
+    await the same in-flight call; across workers, the first insert of
+    the key claims it and the others get 409 until it completes.
+    Failed calls are not remembered, so the client can retry them.
+    A call that succeeded always counts as done: failing to record that in
+    Mongo is retried and logged, never reported as a failed request.
+    """
+
+    def __init__(self, collection, ttl_seconds=86400, lru_size=10000, claim_timeout=60, store_retries=3):
+        self.collection = collection
+        self.store_retries = store_retries
+        self.claim_timeout = claim_timeout  # seconds before an in-progress claim is considered abandoned
+        self.ttl_seconds = ttl_seconds
+        self.lru_size = lru_size
+        self._lru = OrderedDict()  # key -> (fingerprint, response, expires_at)
+        self._in_flight = {}
+
+    def _remember(self, key, request_hash, response):
+        self._lru[key] = (request_hash, response, time.monotonic() + self.ttl_seconds)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _check(self, stored_hash, request_hash):
+        if stored_hash != request_hash:
+            raise HTTPException(
+                status_code=422, detail="Idempotency-Key was already used for a different request"
+            )
+
+    async def run(self, key, request_hash, call):
+        """
+        Return (response, replayed) for `key`, awaiting `call()` at most once.
+        """
+        cached = self._lru.get(key)
+        if cached and cached[2] > time.monotonic():
+            self._check(cached[0], request_hash)
+            self._lru.move_to_end(key)
+            return cached[1], True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            stored_hash, future = in_flight
+            self._check(stored_hash, request_hash)
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (request_hash, future)
+        try:
+            response, replayed = await self._run_once(key, request_hash, call)
+            future.set_result(response)
+            return response, replayed
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _run_once(self, key, request_hash, call):
+        now = datetime.utcnow()
+        try:
+            await self.collection.insert_one({
+                "_id": key,
+                "fingerprint": request_hash,
+                "status": "in_progress",
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds),
+            })
+        except DuplicateKeyError:
+            stored = await self.collection.find_one({"_id": key})
+            if stored is None:
+                # Expired between the insert and the read; treat as new
+                return await self._run_once(key, request_hash, call)
+            self._check(stored["fingerprint"], request_hash)
+            if stored["status"] == "done":
+                self._remember(key, request_hash, stored["response"])
+                return stored["response"], True
+            if not await self._take_over(key, stored, now):
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+
+        try:
+            response = await call()
+        except BaseException:
+            await self.collection.delete_one({"_id": key, "status": "in_progress"})
+            raise
+        # The side effect happened; from here on the key must replay it, not run it again
+        self._remember(key, request_hash, response)
+        await self._store_response(key, response)
+        return response, False
+
+    async def _store_response(self, key, response):
+        """Mark `key` done in Mongo so other workers replay it too"""
+        delay = 0.1
+        for attempt in range(self.store_retries):
+            try:
+                await self.collection.update_one(
+                    {"_id": key}, {"$set": {"status": "done", "response": response}}
+                )
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == self.store_retries - 1:
+                    # This worker still replays it from the LRU
+                    logger.exception("Failed to store the response for Idempotency-Key %s", key)
+                    return
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _take_over(self, key, stored, now):
+        """Reclaim a key whose worker died mid-request"""
+        if stored["created_at"] > now - timedelta(seconds=self.claim_timeout):
+            return False
+        result = await self.collection.update_one(
+            {"_id": key, "status": "in_progress", "created_at": stored["created_at"]},
+            {"$set": {"created_at": now}},
+        )
+        return result.modified_count == 1
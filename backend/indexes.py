@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+MongoDB index declarations for the restaurant API
+
+Run directly to create the indexes and print usage statistics:
+
+    python indexes.py           # ensure indexes, then report usage
+    python indexes.py --stats   # report usage only
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+ROOT_DIR = Path(__file__).parent
+
+INDEXES = {
+    "menu_items": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("category", ASCENDING), ("is_available", ASCENDING)], name="category_available"),
+    ],
+    "orders": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Matches the (created_at, id) keyset used by GET /api/orders
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_desc"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+    ],
+    "idempotency_keys": [
+        # Each key document carries its own expiry time
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        # Buckets expire once they have refilled (RATE_LIMIT_BACKEND=mongo)
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create any declared index that does not exist yet"""
+    created = {}
+    for collection, indexes in INDEXES.items():
+        created[collection] = await db[collection].create_indexes(indexes)
+    return created
+
+
+async def index_usage(db):
+    """Per-index access counters from $indexStats"""
+    usage = {}
+    for collection in INDEXES:
+        stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+        usage[collection] = [
+            {
+                "name": stat["name"],
+                "key": dict(stat["key"]),
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+            }
+            for stat in stats
+        ]
+    return usage
+
+
+async def main(argv):
+    load_dotenv(ROOT_DIR / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    if "--stats" not in argv:
+        created = await ensure_indexes(db)
+        for collection, names in created.items():
+            print(f"{collection}: ensured {', '.join(names)}")
+
+    usage = await index_usage(db)
+    for collection, stats in usage.items():
+        print(f"\n{collection}")
+        for stat in sorted(stats, key=lambda s: s["ops"], reverse=True):
+            print(f"  {stat['name']:<24} {stat['ops']:>10} ops since {stat['since']:%Y-%m-%d %H:%M}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
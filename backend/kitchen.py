@@ -0,0 +1,126 @@
+"""
+Kitchen queue model for order ready-time estimates
+"""
+import heapq
+import math
+from datetime import datetime, timedelta
+
+
+class KitchenSchedule:
+    """
+    Simulates `stations` cooks working through order lines first-come,
+    first-served.
+
+    Each line is a task lasting its item's preparation time per batch of
+    `batch_size` units. A min-heap of station free times gives the next
+    free station in O(log stations), so placing an order never rescans
+    the backlog. Finishing an order early hands its remaining time back
+    to the stations it was on. `rebuild()` replays the active orders from
+    the database to absorb drift and orders placed by other workers;
+    `begin_rebuild()` before the query makes it keep what this worker
+    schedules or completes while the query is in flight.
+    """
+
+    def __init__(self, stations=3, batch_size=4, default_prep_minutes=15):
+        self.stations = stations
+        self.batch_size = batch_size
+        self.default_prep_minutes = default_prep_minutes
+        self.reset()
+
+    def reset(self):
+        self._free_at = [datetime.min] * self.stations
+        self._version = [0] * self.stations
+        # Entries go stale when a station's free time changes; they are skipped on pop
+        self._heap = [(datetime.min, 0, station) for station in range(self.stations)]
+        self._tasks = {}  # order id -> [(station, start, end)]
+        self._changes = None  # order id -> (lines, placed_at), or None once completed
+
+    @property
+    def active_orders(self):
+        return len(self._tasks)
+
+    def task_durations(self, lines):
+        """How long each order line keeps a station busy, longest first"""
+        durations = []
+        for line in lines:
+            minutes = line.get("preparation_time") or self.default_prep_minutes
+            batches = math.ceil(max(line["quantity"], 1) / self.batch_size)
+            durations.append(timedelta(minutes=minutes * batches))
+        return sorted(durations, reverse=True)
+
+    def _set_free_at(self, station, free_at):
+        self._free_at[station] = free_at
+        self._version[station] += 1
+        heapq.heappush(self._heap, (free_at, self._version[station], station))
+        if len(self._heap) > 4 * self.stations:
+            self._heap = [(self._free_at[s], self._version[s], s) for s in range(self.stations)]
+            heapq.heapify(self._heap)
+
+    def _next_station(self):
+        while True:
+            free_at, version, station = heapq.heappop(self._heap)
+            if version == self._version[station]:
+                return station
+
+    def schedule(self, order_id, lines, placed_at):
+        """Queue an order's lines and return when the whole order should be ready"""
+        if self._changes is not None:
+            self._changes[order_id] = (lines, placed_at)
+        tasks = []
+        for duration in self.task_durations(lines):
+            station = self._next_station()
+            start = max(self._free_at[station], placed_at)
+            end = start + duration
+            self._set_free_at(station, end)
+            tasks.append((station, start, end))
+        self._tasks[order_id] = tasks
+        return max((end for _, _, end in tasks), default=placed_at)
+
+    def complete(self, order_id, now):
+        """Release the stations still reserved for an order that is ready (or dropped)"""
+        if self._changes is not None:
+            self._changes[order_id] = None
+        for station, start, end in self._tasks.pop(order_id, ()):
+            unused = end - max(start, now)
+            if unused > timedelta(0):
+                self._set_free_at(station, max(self._free_at[station] - unused, now))
+
+    def backlog(self, now):
+        """Average queued work per station"""
+        queued = sum((max(free_at - now, timedelta(0)) for free_at in self._free_at), timedelta(0))
+        return queued / self.stations
+
+    def begin_rebuild(self):
+        """Start recording local changes that the coming rebuild() query may miss"""
+        self._changes = {}
+
+    def rebuild(self, orders, now):
+        """
+        Replay active orders (oldest first) into an empty schedule.
+
+        Orders scheduled here since `begin_rebuild()` are added if the
+        query missed them, and orders completed since are left out.
+        Orders whose reserved time ended before `now` still shape the queue
+        while replaying but are not kept: they hold no station any more.
+        """
+        changes = self._changes or {}
+        self._changes = None
+        orders = [order for order in orders if changes.get(order["id"], True) is not None]
+        fetched = {order["id"] for order in orders}
+        orders += [
+            {"id": order_id, "items": change[0], "created_at": change[1]}
+            for order_id, change in changes.items()
+            if change is not None and order_id not in fetched
+        ]
+        self.reset()
+        for order in sorted(orders, key=lambda order: order["created_at"]):
+            if self.schedule(order["id"], order["items"], order["created_at"]) <= now:
+                del self._tasks[order["id"]]
+
+    def load(self, now):
+        return {
+            "stations": self.stations,
+            "active_orders": self.active_orders,
+            "backlog_minutes": round(self.backlog(now).total_seconds() / 60, 1),
+            "next_station_free_at": max(min(self._free_at), now),
+        }
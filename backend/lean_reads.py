@@ -0,0 +1,34 @@
+"""
+Lean read path: return stored documents without re-validating them
+"""
+
+
+class LeanModel:
+    """
+    Projection and defaults for serving documents of `model` as stored.
+
+    Documents written through the API were validated on the way in, so
+    reads can project just the model's fields and hand the dicts to the
+    JSON encoder. Fields missing from older documents get the model's
+    defaults, so clients see the same shape as the validated path.
+    """
+
+    def __init__(self, model, nested=None):
+        fields = model.model_fields
+        self.field_count = len(fields)
+        self.projection = {"_id": 0, **dict.fromkeys(fields, 1)}
+        self.defaults = {
+            name: getattr(field.default, "value", field.default)
+            for name, field in fields.items()
+            if not field.is_required() and field.default_factory is None
+        }
+        self.nested = nested or {}  # field -> LeanModel for lists of sub-documents
+
+    def complete(self, document):
+        if len(document) != self.field_count:
+            document = {**self.defaults, **document}
+        for field, lean in self.nested.items():
+            values = document.get(field)
+            if values and any(len(value) != lean.field_count for value in values):
+                document = {**document, field: [lean.complete(value) for value in values]}
+        return document
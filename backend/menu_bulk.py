@@ -0,0 +1,64 @@
+"""
+Bulk menu writes shared by the API and populate_menu.py
+"""
+from pymongo import UpdateOne
+
+IMAGE_FIELDS = ("image_url", "image_variants")
+
+
+def upsert_operation(item):
+    """
+    Upsert one item without undoing an image upload.
+
+    Without an `image_url` key the stored image fields are left alone.
+    With one, it is set like PUT /api/menu/{id} does: image_variants are
+    kept only if the URL is unchanged.
+    """
+    fields = {key: value for key, value in item.items() if key != "id" and key not in IMAGE_FIELDS}
+    if "image_url" not in item:
+        return UpdateOne(
+            {"id": item["id"]},
+            {"$set": fields, "$setOnInsert": dict.fromkeys(IMAGE_FIELDS)},
+            upsert=True,
+        )
+    image_url = item["image_url"]
+    # A pipeline update can compare against the stored URL; $literal keeps
+    # values such as "$5 thali" from being read as field paths
+    return UpdateOne(
+        {"id": item["id"]},
+        [{"$set": {
+            **{key: {"$literal": value} for key, value in fields.items()},
+            "image_url": {"$literal": image_url},
+            "image_variants": {
+                "$cond": [{"$eq": ["$image_url", {"$literal": image_url}]}, "$image_variants", None]
+            },
+        }}],
+        upsert=True,
+    )
+
+
+async def bulk_upsert_menu_items(db, items, prune=False):
+    """
+    Upsert `items` (dicts with an `id`) in one unordered bulk_write.
+
+    Items without an image_url key keep their stored image, so reloading
+    the menu does not undo photo uploads.
+
+    With `prune=True` any menu item whose id is not in the batch is
+    removed afterwards, so a full menu reload never leaves the menu empty.
+    An empty batch cannot be pruned against, since it would delete every item.
+    """
+    if prune and not items:
+        raise ValueError("Refusing to prune the menu against an empty batch")
+    upserted = modified = deleted = 0
+    if items:
+        result = await db.menu_items.bulk_write(
+            [upsert_operation(item) for item in items],
+            ordered=False,
+        )
+        upserted = result.upserted_count
+        modified = result.modified_count
+    if prune:
+        result = await db.menu_items.delete_many({"id": {"$nin": [item["id"] for item in items]}})
+        deleted = result.deleted_count
+    return {"upserted": upserted, "modified": modified, "deleted": deleted}
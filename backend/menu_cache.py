@@ -0,0 +1,116 @@
+"""
+In-process cache for the restaurant menu
+"""
+import time
+
+import orjson
+
+from http_cache import CachedBody, make_etag
+from singleflight import SingleFlight
+
+
+def _category_key(category):
+    # Items may hold the MenuCategory enum or its plain value (lean reads)
+    return getattr(category, "value", category)
+
+
+class MenuSnapshot:
+    """Serialized menu items plus per-category slices for one menu version"""
+
+    def __init__(self, version, items):
+        self.version = version
+        self.items = items
+        self.by_id = {item["id"]: item for item in items}
+        self.by_category = {}
+        for item in items:
+            self.by_category.setdefault(_category_key(item["category"]), []).append(item)
+        self.loaded_at = time.monotonic()
+        self.body = CachedBody.from_data(items)
+        self._category_bodies = {}
+        self._bootstrap = None
+
+    def category(self, category):
+        return self.by_category.get(_category_key(category), [])
+
+    def category_body(self, category):
+        """Pre-serialized body for one category, built on first use"""
+        key = _category_key(category)
+        body = self._category_bodies.get(key)
+        if body is None:
+            body = CachedBody.from_data(self.category(key))
+            self._category_bodies[key] = body
+        return body
+
+    def bootstrap(self, restaurant_info, categories):
+        """
+        (version, body, unchanged_body) for the storefront's initial load,
+        built on first use: restaurant info plus the menu grouped by category.
+        """
+        if self._bootstrap is None:
+            version = make_etag(self.body.body + orjson.dumps(restaurant_info)).strip('"')[:16]
+            menu = {
+                _category_key(category): self.category(category)
+                for category in categories if self.category(category)
+            }
+            self._bootstrap = (
+                version,
+                CachedBody.from_data({"version": version, "restaurant_info": restaurant_info, "menu": menu}),
+                CachedBody.from_data({"version": version, "unchanged": True}),
+            )
+        return self._bootstrap
+
+
+class MenuCache:
+    """
+    Holds the serialized menu between requests.
+
+    `version` follows the shared menu version in Mongo (see menu_version.py):
+    menu writes bump it and pass the new value to `observe_version()`, and
+    a background task does the same for bumps made by other workers. The
+    snapshot is dropped whenever the version moves; the TTL is only a
+    fallback for writes that skip the version bump.
+    """
+
+    def __init__(self, loader, ttl=300.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot = None
+        self._flight = SingleFlight("menu")
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None or snapshot.version != self.version:
+            return False
+        return self.ttl > 0 and time.monotonic() - snapshot.loaded_at < self.ttl
+
+    def observe_version(self, version):
+        """Drop the cached menu if the shared version moved"""
+        if version != self.version:
+            self.version = version
+            self._snapshot = None
+
+    def peek(self):
+        """The snapshot for the current version if one is loaded, however old; never loads"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        return None
+
+    async def get(self):
+        """Return the current menu snapshot, loading it if needed"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        # A missing snapshot means the menu changed: the loader must see the write
+        after_write = snapshot is None
+        # Concurrent misses for the same version share one load
+        return await self._flight.do(self.version, lambda: self._load(after_write))
+
+    async def _load(self, after_write):
+        version = self.version
+        items = await self.loader(after_write)
+        snapshot = MenuSnapshot(version, items)
+        # Only publish if no write landed while we were loading
+        if version == self.version:
+            self._snapshot = snapshot
+        return snapshot
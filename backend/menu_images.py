@@ -0,0 +1,165 @@
+"""
+Menu item images: resized variants under content-hashed, immutable URLs
+"""
+import asyncio
+import hashlib
+import io
+import mimetypes
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # uploads answer 503 without Pillow
+    Image = None
+
+# Variant name -> longest side in pixels; images are never upscaled
+VARIANT_SIZES = {"thumb": 320, "card": 640, "full": 1600}
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+DEFAULT_VARIANT = "card.webp"  # what image_url points at
+MAX_PIXELS = 40_000_000
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Keys are "menu/<content hash>/<variant>.<ext>"; anything else is not ours
+KEY_PATTERN = re.compile(r"^menu/[0-9a-f]{16}/[a-z]+\.[a-z0-9]+$")
+
+
+def key_content_type(key):
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def render_variants(data):
+    """
+    Decode an upload and encode every variant: {"thumb.webp": bytes, ...},
+    plus the upload itself as "original.<ext>".
+
+    Runs in a worker process, so it must stay a plain top-level function.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise InvalidImage(str(exc))
+    original_ext = (image.format or "bin").lower().replace("jpeg", "jpg")
+    image = ImageOps.exif_transpose(image).convert("RGB")
+
+    variants = {f"original.{original_ext}": data}
+    for name, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for ext, pil_format in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            if pil_format == "JPEG":
+                resized.save(buffer, pil_format, quality=82, optimize=True, progressive=True)
+            else:
+                resized.save(buffer, pil_format, quality=80, method=4)
+            variants[f"{name}.{ext}"] = buffer.getvalue()
+    return variants
+
+
+class LocalImageStore:
+    """Files under `root`, served by GET /api/images/{key}"""
+
+    def __init__(self, root, base_url="/api/images"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+    async def exists(self, key):
+        return await asyncio.to_thread(os.path.exists, self.path(key))
+
+    async def put(self, key, data, content_type):
+        await asyncio.to_thread(self._write, self.path(key), data)
+
+    @staticmethod
+    def _write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a reader never sees a half-written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class S3ImageStore:
+    """
+    Objects in an S3 bucket (or any S3-compatible store), served from
+    `public_url` (the bucket or a CDN in front of it), not by the API.
+    """
+
+    def __init__(self, bucket, public_url, prefix=""):
+        import boto3
+
+        self.client = boto3.client("s3")
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.prefix = prefix
+
+    def url(self, key):
+        return f"{self.public_url}/{self.prefix}{key}"
+
+    async def exists(self, key):
+        def head():
+            try:
+                self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+                return True
+            except self.client.exceptions.ClientError:
+                return False
+        return await asyncio.to_thread(head)
+
+    async def put(self, key, data, content_type):
+        await asyncio.to_thread(
+            self.client.put_object,
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+        )
+
+
+class ImageProcessor:
+    """
+    Turns uploads into stored variants, encoding in a process pool so
+    resizing never blocks the event loop. Identical uploads hash to the
+    same keys and are only encoded once.
+    """
+
+    def __init__(self, store, workers=2):
+        self.store = store
+        self.workers = workers
+        self._pool = None
+
+    @property
+    def available(self):
+        return Image is not None
+
+    async def process(self, data):
+        """Store every variant of `data`; returns {"card.webp": url, ...}"""
+        prefix = f"menu/{hashlib.sha256(data).hexdigest()[:16]}/"
+        variants = [f"{name}.{ext}" for name in VARIANT_SIZES for ext in VARIANT_FORMATS]
+        if not await self.store.exists(prefix + DEFAULT_VARIANT):
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            loop = asyncio.get_running_loop()
+            rendered = await loop.run_in_executor(self._pool, render_variants, data)
+            # The default variant goes last: its presence means the set is complete
+            for variant in sorted(rendered, key=lambda variant: variant == DEFAULT_VARIANT):
+                await self.store.put(prefix + variant, rendered[variant], key_content_type(variant))
+        return {variant: self.store.url(prefix + variant) for variant in variants}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
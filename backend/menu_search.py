@@ -0,0 +1,136 @@
+"""
+In-memory inverted index for menu search
+"""
+import bisect
+import re
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Relevance weight of a token match per field
+FIELD_WEIGHTS = {"name": 3, "ingredients": 2, "description": 1}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def _item_tokens(item):
+    weights = defaultdict(int)
+    for token in tokenize(item["name"]):
+        weights[token] = max(weights[token], FIELD_WEIGHTS["name"])
+    for token in tokenize(" ".join(item.get("ingredients") or [])):
+        weights[token] = max(weights[token], FIELD_WEIGHTS["ingredients"])
+    for token in tokenize(item.get("description") or ""):
+        weights[token] = max(weights[token], FIELD_WEIGHTS["description"])
+    return weights
+
+
+class MenuSearchIndex:
+    """
+    Inverted index over name, description and ingredients.
+
+    `sync()` is called with each new menu snapshot and only re-indexes the
+    items that were added, changed or removed since the last one.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._postings = defaultdict(dict)  # token -> {item_id: weight}
+        self._item_tokens = {}
+        self._sorted_tokens = []
+        self._snapshot = None
+
+    def sync(self, snapshot):
+        if snapshot is self._snapshot:
+            return
+        items = {item["id"]: item for item in snapshot.items}
+        for item_id in list(self._items):
+            if item_id not in items:
+                self._remove(item_id)
+        for item_id, item in items.items():
+            if self._items.get(item_id) != item:
+                self._remove(item_id)
+                self._add(item)
+        self._sorted_tokens = sorted(self._postings)
+        self._snapshot = snapshot
+
+    def _add(self, item):
+        tokens = _item_tokens(item)
+        for token, weight in tokens.items():
+            self._postings[token][item["id"]] = weight
+        self._items[item["id"]] = item
+        self._item_tokens[item["id"]] = tokens
+
+    def _remove(self, item_id):
+        for token in self._item_tokens.pop(item_id, {}):
+            postings = self._postings[token]
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[token]
+        self._items.pop(item_id, None)
+
+    def _prefix_matches(self, prefix):
+        """Merged postings of every token starting with `prefix`"""
+        matches = {}
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            for item_id, weight in self._postings[token].items():
+                matches[item_id] = max(matches.get(item_id, 0), weight)
+        return matches
+
+    def _score(self, query):
+        """Item id -> relevance; every query token must match, the last one as a prefix"""
+        tokens = tokenize(query)
+        if not tokens:
+            return {item_id: 0 for item_id in self._items}
+        scores = None
+        for i, token in enumerate(tokens):
+            if i == len(tokens) - 1:
+                matches = self._prefix_matches(token)
+            else:
+                matches = self._postings.get(token, {})
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {item_id: score + matches[item_id] for item_id, score in scores.items() if item_id in matches}
+            if not scores:
+                break
+        return scores
+
+    def search(self, query="", category=None, min_price=None, max_price=None,
+               is_spicy=None, is_available=None, limit=50):
+        """Matching items (best first) plus facet counts over the full match set"""
+        results = []
+        for item_id, score in self._score(query).items():
+            item = self._items[item_id]
+            if category is not None and item["category"] != category:
+                continue
+            if min_price is not None and item["price"] < min_price:
+                continue
+            if max_price is not None and item["price"] > max_price:
+                continue
+            if is_spicy is not None and item["is_spicy"] != is_spicy:
+                continue
+            if is_available is not None and item["is_available"] != is_available:
+                continue
+            results.append((score, item))
+        results.sort(key=lambda result: (-result[0], result[1]["name"]))
+
+        facets = {"category": defaultdict(int), "is_spicy": defaultdict(int), "is_available": defaultdict(int)}
+        prices = []
+        for _, item in results:
+            facets["category"][item["category"]] += 1
+            facets["is_spicy"][str(item["is_spicy"]).lower()] += 1
+            facets["is_available"][str(item["is_available"]).lower()] += 1
+            prices.append(item["price"])
+        facets = {name: dict(counts) for name, counts in facets.items()}
+        facets["price"] = {"min": min(prices), "max": max(prices)} if prices else {"min": None, "max": None}
+
+        return {
+            "items": [item for _, item in results[:limit]],
+            "total": len(results),
+            "facets": facets,
+        }
@@ -0,0 +1,55 @@
+"""
+Shared menu version, so every worker notices menu writes
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+MENU_VERSION_ID = "menu"
+
+
+async def bump_menu_version(collection):
+    """Atomically increment the menu version after a menu write; returns the new version"""
+    document = await collection.find_one_and_update(
+        {"_id": MENU_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return document["version"]
+
+
+async def read_menu_version(collection):
+    document = await collection.find_one({"_id": MENU_VERSION_ID}, {"version": 1})
+    return document["version"] if document else 0
+
+
+async def follow_menu_version(collection, on_version, poll_interval=2.0, use_change_stream=False):
+    """
+    Call `on_version(version)` with the current version, then whenever it moves.
+
+    Polling reads one small document per interval. A change stream
+    (replica sets only) pushes bumps immediately; the version is re-read
+    on every (re)connect so bumps made while disconnected are not missed.
+    """
+    while True:
+        try:
+            on_version(await read_menu_version(collection))
+            if not use_change_stream:
+                await asyncio.sleep(poll_interval)
+                continue
+            pipeline = [{"$match": {"documentKey._id": MENU_VERSION_ID}}]
+            async with collection.watch(pipeline, full_document="updateLookup") as stream:
+                async for change in stream:
+                    document = change.get("fullDocument")
+                    if document:
+                        on_version(document["version"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to read the menu version; retrying in %.0fs", poll_interval)
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,225 @@
+"""
+Request and MongoDB latency metrics in Prometheus text format
+"""
+import logging
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, labels=(), amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {series[-1]}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {series[-2]}")
+            lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name, help_text, labelnames=()):
+        if name not in self.metrics:
+            self.metrics[name] = Counter(name, help_text, labelnames)
+        return self.metrics[name]
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        if name not in self.metrics:
+            self.metrics[name] = Histogram(name, help_text, labelnames, buckets)
+        return self.metrics[name]
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and status", ("method", "route", "status")
+)
+DB_LATENCY = registry.histogram(
+    "mongodb_operation_duration_seconds", "MongoDB operation latency", ("collection", "operation")
+)
+DB_ERRORS = registry.counter(
+    "mongodb_operation_errors_total", "MongoDB operations that raised", ("collection", "operation")
+)
+
+
+class MetricsMiddleware:
+    """Records request latency per route template and logs slow requests"""
+
+    def __init__(self, app, slow_request_ms=0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Use the route template, not the raw path, to keep label cardinality bounded
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe((scope["method"], route_path, status), elapsed)
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning(
+                    "Slow request: %s %s -> %s in %.1f ms",
+                    scope["method"], scope["path"], status, elapsed * 1000
+                )
+
+
+# Collection methods that are awaited directly
+TIMED_OPERATIONS = {
+    "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "find_one_and_update", "find_one_and_replace",
+    "find_one_and_delete", "count_documents", "bulk_write", "create_indexes", "distinct",
+}
+# Collection methods that return a cursor
+CURSOR_OPERATIONS = {"find", "aggregate"}
+
+
+class _TimedCursor:
+    def __init__(self, cursor, labels):
+        self._cursor = cursor
+        self._labels = labels
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name == "to_list":
+            return _timed(attr, self._labels)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # sort/limit/batch_size return the cursor itself; keep it wrapped
+            return self if result is self._cursor else result
+        return chained
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        start = time.perf_counter()
+        try:
+            async for document in self._cursor:
+                yield document
+        finally:
+            DB_LATENCY.observe(self._labels, time.perf_counter() - start)
+
+
+def _timed(method, labels):
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(labels)
+            raise
+        finally:
+            DB_LATENCY.observe(labels, time.perf_counter() - start)
+    return timed
+
+
+class InstrumentedCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        labels = (self._collection.name, name)
+        if name in TIMED_OPERATIONS:
+            return _timed(attr, labels)
+        if name in CURSOR_OPERATIONS:
+            return lambda *args, **kwargs: _TimedCursor(attr(*args, **kwargs), labels)
+        return attr
+
+
+class InstrumentedDatabase:
+    """Wraps a Motor database so every collection operation is timed"""
+
+    def __init__(self, database):
+        self._database = database
+        self._collections = {}
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = InstrumentedCollection(self._database[name])
+        return collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._database, name)
+        if hasattr(attr, "insert_one"):
+            return self[name]
+        return attr
@@ -0,0 +1,150 @@
+"""
+In-process fan-out hub for real-time order events
+"""
+import asyncio
+import logging
+import uuid
+from collections import deque
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class OrderEvent:
+    def __init__(self, epoch, seq, event_type, order):
+        self.seq = seq
+        self.id = f"{epoch}-{seq}"
+        self.type = event_type
+        self.order = order
+
+    def to_sse(self):
+        data = orjson.dumps({"type": self.type, "order": self.order}).decode()
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    def __init__(self, hub, max_queue):
+        self.hub = hub
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def push(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up; it will reconnect and replay from the buffer
+            self.overflowed = True
+            self.queue = asyncio.Queue(maxsize=1)
+            self.queue.put_nowait(None)
+
+    def close(self):
+        self.hub.subscribers.discard(self)
+
+
+class OrderEventHub:
+    """
+    Broadcasts order events to every subscriber.
+
+    Events get increasing ids and the last `buffer_size` are kept so a
+    reconnecting client (SSE Last-Event-ID) only receives what it missed.
+    Ids are prefixed with a per-process epoch: a client whose last id came
+    from another worker, or from before a restart, is told to reset.
+    While a Mongo change stream feeds the hub, handler-side `notify()`
+    calls are ignored so each change is delivered once, and the change
+    stream's resume token lets the watcher pick up where it left off.
+    """
+
+    def __init__(self, buffer_size=1000, max_queue=1000):
+        self.buffer = deque(maxlen=buffer_size)
+        self.max_queue = max_queue
+        self.subscribers = set()
+        self.epoch = uuid.uuid4().hex[:12]
+        self.last_id = 0
+        self.uses_change_stream = False
+        self.resume_token = None
+
+    def publish(self, event_type, order):
+        self.last_id += 1
+        event = OrderEvent(self.epoch, self.last_id, event_type, order)
+        self.buffer.append(event)
+        for subscription in list(self.subscribers):
+            subscription.push(event)
+        return event
+
+    def notify(self, event_type, order):
+        """Publish from a request handler, unless the change stream already does"""
+        if not self.uses_change_stream:
+            self.publish(event_type, order)
+
+    def subscribe(self, last_event_id=None):
+        """
+        New subscription, pre-filled with events after `last_event_id`.
+
+        Returns (subscription, complete) where `complete` is False when the
+        missed events are no longer buffered, or the id is not one of this
+        hub's, and the client must refetch.
+        """
+        subscription = Subscription(self, self.max_queue)
+        complete = True
+        if last_event_id is not None:
+            last_seq = self._sequence(last_event_id)
+            if last_seq is None:
+                complete = False
+            elif last_seq < self.last_id:
+                oldest = self.buffer[0].seq if self.buffer else self.last_id + 1
+                complete = last_seq + 1 >= oldest
+                for event in self.buffer:
+                    if event.seq > last_seq:
+                        subscription.push(event)
+        self.subscribers.add(subscription)
+        return subscription, complete
+
+    def _sequence(self, event_id):
+        """Sequence number of one of our event ids; None for another epoch or a bad id"""
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.last_id:
+            return None
+        return int(seq)
+
+    def _publish_change(self, change):
+        order = change.get("fullDocument")
+        if not order:
+            return
+        order.pop("_id", None)
+        event_type = "order.created" if change["operationType"] == "insert" else "order.updated"
+        self.publish(event_type, order)
+
+    async def watch_changes(self, collection, retry_delay=5.0):
+        """
+        Feed the hub from a MongoDB change stream (requires a replica set).
+
+        Handler-side notify() calls are only suppressed while the stream is
+        open, so on a standalone server, or while the stream is being
+        re-opened, the feed falls back to them. Around those switches an
+        event may be delivered twice.
+        """
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        while True:
+            try:
+                async with collection.watch(
+                    pipeline, full_document="updateLookup", resume_after=self.resume_token
+                ) as stream:
+                    # The stream is only opened by the first read
+                    change = await stream.try_next()
+                    self.uses_change_stream = True
+                    if change is not None:
+                        self.resume_token = stream.resume_token
+                        self._publish_change(change)
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        self._publish_change(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order change stream failed; retrying in %.0fs", retry_delay)
+            finally:
+                self.uses_change_stream = False
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,60 @@
+"""
+Row serializers for the streaming order export
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+CSV_COLUMNS = [
+    "id", "created_at", "status", "order_type", "customer_name", "customer_phone",
+    "customer_email", "total_amount", "items", "delivery_address", "special_notes",
+]
+# Typed in by customers, so they may hold spreadsheet formulas
+CUSTOMER_TEXT_COLUMNS = (
+    "customer_name", "customer_phone", "customer_email", "delivery_address", "special_notes",
+)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_line(order):
+    return json.dumps(order, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def _spreadsheet_safe(value):
+    """Quote a cell a spreadsheet would otherwise evaluate as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_header():
+    return _csv_line(CSV_COLUMNS)
+
+
+def csv_line(order):
+    row = dict(order)
+    row["created_at"] = order["created_at"].isoformat()
+    # "<menu_item_id> x<quantity>" per line, ';'-separated
+    row["items"] = "; ".join(f"{item['menu_item_id']} x{item['quantity']}" for item in order["items"])
+    for column in CUSTOMER_TEXT_COLUMNS:
+        row[column] = _spreadsheet_safe(row[column])
+    return _csv_line([row[column] for column in CSV_COLUMNS])
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", None, ndjson_line),
+    "csv": ("text/csv", csv_header, csv_line),
+}
@@ -0,0 +1,241 @@
+"""
+Write-behind journal for new orders
+
+With ORDER_JOURNAL_DIR set, an order is acknowledged once it is fsync'ed
+to a local append-only file; a background task then copies pending
+orders into Mongo with insert_many. Each worker process claims its own
+journal file with an exclusive lock and replays what is left in it on
+startup, so orders survive a crash or a Mongo outage.
+
+Until an order is flushed only the worker that journaled it lists it.
+Other workers on the same host can still look it up by id through
+find_sibling(); workers on other hosts cannot see it at all.
+"""
+import asyncio
+import fcntl
+import logging
+import os
+from collections import OrderedDict
+
+import orjson
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def read_pending(file):
+    """Raw orders a journal file still holds, by id"""
+    pending = OrderedDict()
+    for line in file:
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # A torn final write; that order was never acknowledged
+            continue
+        if "order" in record:
+            pending[record["order"]["id"]] = record["order"]
+        else:
+            for order_id in record["flushed"]:
+                pending.pop(order_id, None)
+    return pending
+
+
+def matches(document, query):
+    """Evaluate the small subset of Mongo filters the order routes build"""
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif field == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(field)
+            for op, operand in condition.items():
+                if op == "$in":
+                    ok = value in operand
+                elif value is None:
+                    ok = False
+                elif op == "$gte":
+                    ok = value >= operand
+                elif op == "$lt":
+                    ok = value < operand
+                else:
+                    raise ValueError(f"Unsupported operator {op}")
+                if not ok:
+                    return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+class OrderJournal:
+    """
+    Orders acknowledged to clients but not yet known to be in Mongo.
+
+    Appends from concurrent requests are group-committed: one write and
+    one fsync per batch. After a batch reaches Mongo a "flushed" record
+    is appended; the file is truncated whenever nothing is pending.
+    """
+
+    def __init__(self, directory, decode, batch_size=100, max_retry_delay=30.0):
+        self.directory = directory
+        self.decode = decode  # journal JSON -> order document (restores datetimes)
+        self.batch_size = batch_size
+        self.max_retry_delay = max_retry_delay
+        self.pending = OrderedDict()  # order id -> order document
+        self.path = None
+        self._file = None
+        self._write_queue = []
+        self._writer = None
+        self._wake = asyncio.Event()
+        self._flushed = asyncio.Condition()
+
+    def open(self):
+        """Claim a journal file and load the orders it still holds"""
+        os.makedirs(self.directory, exist_ok=True)
+        slot = 0
+        while True:
+            path = os.path.join(self.directory, f"orders-{slot}.jsonl")
+            file = open(path, "a+b")
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                file.close()
+                slot += 1
+        self.path, self._file = path, file
+
+        file.seek(0)
+        for order_id, order in read_pending(file).items():
+            self.pending[order_id] = self.decode(order)
+        if self.pending:
+            logger.info("Replaying %d journaled orders from %s", len(self.pending), path)
+            self._wake.set()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    async def append(self, order):
+        """Durably record a new order; returns once it is on disk"""
+        await self._write({"order": order}, order)
+
+    async def _write(self, record, order=None):
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.append((orjson.dumps(record) + b"\n", order, future))
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_batches())
+        await future
+
+    async def _write_batches(self):
+        try:
+            while self._write_queue:
+                batch, self._write_queue = self._write_queue, []
+                try:
+                    await asyncio.to_thread(self._write_lines, [line for line, _, _ in batch])
+                except Exception as exc:
+                    for _, _, future in batch:
+                        future.set_exception(exc)
+                    continue
+                for _, order, future in batch:
+                    if order is not None:
+                        self.pending[order["id"]] = order
+                    future.set_result(None)
+                self._wake.set()
+                if not self.pending and not self._write_queue:
+                    await asyncio.to_thread(self._file.truncate, 0)
+        finally:
+            self._writer = None
+
+    def _write_lines(self, lines):
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def run(self, collection, on_flushed=None):
+        """Copy pending orders into `collection` until cancelled"""
+        retry_delay = 1.0
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self.pending:
+                batch = list(self.pending.values())[:self.batch_size]
+                try:
+                    inserted = await self._insert(collection, batch)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception(
+                        "Failed to flush %d journaled orders; retrying in %.0fs", len(self.pending), retry_delay
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, self.max_retry_delay)
+                    continue
+                retry_delay = 1.0
+                await self._mark_flushed([order["id"] for order in batch])
+                if on_flushed:
+                    try:
+                        await on_flushed(inserted)
+                    except Exception:
+                        logger.exception("on_flushed failed for %d orders", len(inserted))
+
+    async def _insert(self, collection, batch):
+        """insert_many the batch; returns the orders that were not already stored"""
+        try:
+            await collection.insert_many([dict(order) for order in batch], ordered=False)
+            return batch
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if any(error["code"] != DUPLICATE_KEY for error in errors):
+                raise
+            # Flushed before a crash but not marked; nothing left to do for those
+            duplicates = {error["index"] for error in errors}
+            return [order for index, order in enumerate(batch) if index not in duplicates]
+
+    async def _mark_flushed(self, order_ids):
+        for order_id in order_ids:
+            self.pending.pop(order_id, None)
+        async with self._flushed:
+            self._flushed.notify_all()
+        try:
+            await self._write({"flushed": order_ids})
+        except Exception:
+            # They are in Mongo either way; a replay would skip them as duplicates
+            logger.exception("Failed to record %d flushed orders in %s", len(order_ids), self.path)
+
+    async def wait_flushed(self, order_id, timeout):
+        """Wait until `order_id` is in Mongo; False if still pending after `timeout` seconds"""
+        async with self._flushed:
+            try:
+                await asyncio.wait_for(
+                    self._flushed.wait_for(lambda: order_id not in self.pending), timeout
+                )
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def _read_siblings(self, order_id):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not (name.startswith("orders-") and name.endswith(".jsonl")):
+                continue
+            try:
+                with open(path, "rb") as file:
+                    order = read_pending(file).get(order_id)
+            except FileNotFoundError:
+                continue
+            if order is not None:
+                return self.decode(order)
+        return None
+
+    async def find_sibling(self, order_id):
+        """A pending order journaled by another worker sharing this directory, or None"""
+        return await asyncio.to_thread(self._read_siblings, order_id)
+
+    def find(self, query):
+        """Pending orders matching a Mongo-style order filter"""
+        return [order for order in self.pending.values() if matches(order, query)]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained daily order aggregates
+
+Every new order $inc's one document per business day in
+`order_daily_summary`, so reports never scan the raw orders. To rebuild
+the summaries from existing orders:
+
+    python order_summary.py --rebuild
+"""
+import asyncio
+import os
+import sys
+from collections import defaultdict
+from datetime import timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+
+ROOT_DIR = Path(__file__).parent
+
+
+def business_date(created_at, tz):
+    """Local calendar date (YYYY-MM-DD) of a naive-UTC timestamp"""
+    return created_at.replace(tzinfo=timezone.utc).astimezone(tz).date().isoformat()
+
+
+def _field(key):
+    # Keys become field names; dots and a leading $ would break update paths
+    return str(key).replace(".", "_").lstrip("$") or "_"
+
+
+def _order_totals(order):
+    """Per-order contributions: (order_type, revenue, {item_id: [name, quantity, revenue]})"""
+    items = {}
+    for line in order["items"]:
+        entry = items.setdefault(_field(line["menu_item_id"]), [line.get("name"), 0, 0.0])
+        entry[1] += line["quantity"]
+        entry[2] += line.get("line_total") or 0.0
+    return _field(order["order_type"]), order["total_amount"], items
+
+
+def summary_update(order, tz):
+    """(day, update document) adding `order` to its day's summary"""
+    day = business_date(order["created_at"], tz)
+    order_type, revenue, items = _order_totals(order)
+    increments = {
+        "order_count": 1,
+        "revenue": revenue,
+        f"by_order_type.{order_type}.count": 1,
+        f"by_order_type.{order_type}.revenue": revenue,
+    }
+    names = {}
+    for item_id, (name, quantity, item_revenue) in items.items():
+        increments[f"items.{item_id}.quantity"] = quantity
+        increments[f"items.{item_id}.revenue"] = item_revenue
+        if name:
+            names[f"items.{item_id}.name"] = name
+    update = {"$inc": increments, "$setOnInsert": {"date": day}}
+    if names:
+        update["$set"] = names
+    return day, update
+
+
+async def record_order(summaries, order, tz):
+    """Add one newly created order to the daily summary"""
+    day, update = summary_update(order, tz)
+    await summaries.update_one({"_id": day}, update, upsert=True)
+
+
+def summary_view(summary, top_n=10):
+    """API shape of a summary document, with its best-selling items"""
+    items = [
+        {"menu_item_id": item_id, "name": item.get("name"), "quantity": item["quantity"], "revenue": item["revenue"]}
+        for item_id, item in summary.get("items", {}).items()
+    ]
+    items.sort(key=lambda item: (-item["quantity"], -item["revenue"]))
+    return {
+        "date": summary["_id"],
+        "order_count": summary["order_count"],
+        "revenue": round(summary["revenue"], 2),
+        "average_ticket": round(summary["revenue"] / summary["order_count"], 2) if summary["order_count"] else 0.0,
+        "by_order_type": summary.get("by_order_type", {}),
+        "top_items": items[:top_n],
+    }
+
+
+async def rebuild_summaries(orders, summaries, tz):
+    """Recompute every daily summary from the orders collection"""
+    days = {}
+    projection = {"_id": 0, "created_at": 1, "order_type": 1, "total_amount": 1, "items": 1}
+    async for order in orders.find({}, projection).batch_size(1000):
+        day = business_date(order["created_at"], tz)
+        summary = days.get(day)
+        if summary is None:
+            summary = days[day] = {
+                "_id": day, "date": day, "order_count": 0, "revenue": 0.0,
+                "by_order_type": defaultdict(lambda: {"count": 0, "revenue": 0.0}),
+                "items": defaultdict(lambda: {"quantity": 0, "revenue": 0.0}),
+            }
+        order_type, revenue, items = _order_totals(order)
+        summary["order_count"] += 1
+        summary["revenue"] += revenue
+        summary["by_order_type"][order_type]["count"] += 1
+        summary["by_order_type"][order_type]["revenue"] += revenue
+        for item_id, (name, quantity, item_revenue) in items.items():
+            item = summary["items"][item_id]
+            item["quantity"] += quantity
+            item["revenue"] += item_revenue
+            if name:
+                item["name"] = name
+
+    for summary in days.values():
+        summary["by_order_type"] = dict(summary["by_order_type"])
+        summary["items"] = dict(summary["items"])
+    if days:
+        await summaries.bulk_write(
+            [ReplaceOne({"_id": day}, summary, upsert=True) for day, summary in days.items()],
+            ordered=False,
+        )
+    await summaries.delete_many({"_id": {"$nin": list(days)}})
+    return len(days)
+
+
+async def main(argv):
+    load_dotenv(ROOT_DIR / '.env')
+    if "--rebuild" not in argv:
+        print(__doc__)
+        return
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    tz = ZoneInfo(os.environ.get('REPORTING_TIMEZONE', 'Asia/Kolkata'))
+    count = await rebuild_summaries(db.orders, db.order_daily_summary, tz)
+    print(f"Rebuilt {count} daily summaries")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 import os
 from pathlib import Path
 
+from menu_bulk import bulk_upsert_menu_items
+from menu_version import bump_menu_version
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -17,9 +20,6 @@ async def populate_menu():
     client = AsyncIOMotorClient(mongo_url)
     db = client[os.environ['DB_NAME']]
     
-    # Clear existing menu items
-    await db.menu_items.delete_many({})
-    
     # Sample menu items for Shriyansh Restaurant
     menu_items = [
         # Appetizers
@@ -312,9 +312,14 @@ async def populate_menu():
         }
     ]
     
-    # Insert menu items
-    result = await db.menu_items.insert_many(menu_items)
-    print(f"Inserted {len(result.inserted_ids)} menu items successfully!")
+    # Upsert the whole menu and drop stale items; the live menu is never empty
+    result = await bulk_upsert_menu_items(db, menu_items, prune=True)
+    # Running API workers pick the new menu up on their next version check
+    await bump_menu_version(db.menu_version)
+    print(
+        f"Menu loaded: {result['upserted']} inserted, {result['modified']} updated, "
+        f"{result['deleted']} removed ({len(menu_items)} items total)"
+    )
     
     client.close()
 
@@ -0,0 +1,141 @@
+"""
+Per-client rate limiting and load shedding
+"""
+import math
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from metrics import registry
+
+REJECTED_REQUESTS = registry.counter(
+    "requests_rejected_total", "Requests refused by the rate limiter or load shedder", ("reason",)
+)
+
+
+class MemoryRateLimiter:
+    """
+    Token bucket per key, held in this worker's memory.
+
+    `rate` tokens per second refill a bucket of `burst` tokens. Each bucket
+    is stored as the single time at which it will be full again (GCRA), so
+    there is no background refill work.
+    """
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.interval = 1.0 / rate
+        self.window = burst * self.interval
+        self.max_keys = max_keys
+        self._full_at = {}
+
+    async def acquire(self, key):
+        """Take a token for `key`; return 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        full_at = max(self._full_at.get(key, now), now) + self.interval
+        if full_at - now > self.window:
+            return full_at - now - self.window
+        if key not in self._full_at and len(self._full_at) >= self.max_keys:
+            # Buckets that have refilled carry no state worth keeping
+            self._full_at = {k: v for k, v in self._full_at.items() if v > now}
+        self._full_at[key] = full_at
+        return 0
+
+
+class MongoRateLimiter:
+    """
+    The same token bucket, shared by every worker through a Mongo collection.
+
+    Each key is one document updated with a compare-and-set on its previous
+    state; the TTL index on expires_at removes buckets once they are full.
+    """
+
+    def __init__(self, collection, rate, burst, retries=3):
+        self.collection = collection
+        self.interval = 1.0 / rate
+        self.window = burst * self.interval
+        self.retries = retries
+
+    async def acquire(self, key):
+        for _ in range(self.retries):
+            now = time.time()
+            stored = await self.collection.find_one({"_id": key})
+            previous = stored["full_at"] if stored else None
+            full_at = max(previous or now, now) + self.interval
+            if full_at - now > self.window:
+                return full_at - now - self.window
+
+            expires_at = datetime.utcnow() + timedelta(seconds=full_at - now)
+            if stored is None:
+                try:
+                    await self.collection.insert_one({"_id": key, "full_at": full_at, "expires_at": expires_at})
+                    return 0
+                except DuplicateKeyError:
+                    continue
+            result = await self.collection.update_one(
+                {"_id": key, "full_at": previous},
+                {"$set": {"full_at": full_at, "expires_at": expires_at}},
+            )
+            if result.modified_count == 1:
+                return 0
+        # Lost every race for this key; it is clearly busy
+        return self.interval
+
+
+async def enforce(limiter, key):
+    """Raise 429 with Retry-After if `key` has no token left (no-op without a limiter)"""
+    if limiter is None:
+        return
+    retry_after = await limiter.acquire(key)
+    if retry_after:
+        REJECTED_REQUESTS.inc(("rate_limited",))
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+class LoadSheddingMiddleware:
+    """
+    Refuses requests with 503 once `max_in_flight` are already being served.
+
+    Failing fast keeps latency bounded for the requests that are admitted,
+    instead of letting every request queue behind a saturated Motor pool.
+    Long-lived streams are exempt since they hold a slot for their lifetime.
+    """
+
+    def __init__(self, app, max_in_flight, retry_after=1, exempt_paths=()):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.exempt_paths = set(exempt_paths)
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_in_flight or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            REJECTED_REQUESTS.inc(("overloaded",))
+            body = orjson.dumps({"detail": "Server is busy, please retry later"})
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
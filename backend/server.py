@@ -1,27 +1,209 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, File, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import ConnectionFailure
+from contextlib import asynccontextmanager
 import os
+import asyncio
+import math
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 import uuid
-from datetime import datetime
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 from enum import Enum
 
+from analytics import (
+    ResultCache, best_sellers_pipeline, created_at_range, revenue_pipeline, round_amounts,
+    ticket_size_pipeline,
+)
+from compression import CompressionMiddleware
+from database import client_options, menu_read_preference, orders_write_concern
+from http_cache import CachedBody, cached_response
+from idempotency import IdempotencyStore, fingerprint
+from indexes import ensure_indexes
+from kitchen import KitchenSchedule
+from lean_reads import LeanModel
+from menu_bulk import bulk_upsert_menu_items
+from menu_cache import MenuCache
+from menu_images import (
+    DEFAULT_VARIANT, IMMUTABLE_CACHE_CONTROL, KEY_PATTERN, ImageProcessor, InvalidImage,
+    LocalImageStore, S3ImageStore, key_content_type,
+)
+from menu_search import MenuSearchIndex
+from menu_version import bump_menu_version, follow_menu_version
+from order_events import OrderEventHub
+from singleflight import SingleFlight
+from metrics import InstrumentedDatabase, MetricsMiddleware, registry as metrics_registry
+from order_export import EXPORT_FORMATS
+from order_journal import OrderJournal
+from order_summary import record_order, summary_view
+from rate_limit import LoadSheddingMiddleware, MemoryRateLimiter, MongoRateLimiter, enforce
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection. The client is created in `lifespan`, not at import,
+# so every uvicorn worker opens its own pool after forking.
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+DB_NAME = os.environ['DB_NAME']
+client = None
+db = None  # primary reads, explicit write concern
+menu_db = None  # menu reads, MENU_READ_PREFERENCE
+
+# Menu cache settings
+MENU_CACHE_TTL = float(os.environ.get('MENU_CACHE_TTL', '300'))  # in seconds
+# How often workers check the shared menu version, i.e. the longest a menu
+# write can take to reach every worker (unless the change stream is used)
+MENU_VERSION_POLL_SECONDS = float(os.environ.get('MENU_VERSION_POLL_SECONDS', '2'))
+MENU_VERSION_CHANGE_STREAM = os.environ.get('MENU_VERSION_CHANGE_STREAM', 'false').lower() == 'true'
+
+# HTTP caching headers for browsers and the CDN
+MENU_CACHE_CONTROL = os.environ.get(
+    'MENU_CACHE_CONTROL', 'public, max-age=30, stale-while-revalidate=300'
+)
+INFO_CACHE_CONTROL = os.environ.get(
+    'INFO_CACHE_CONTROL', 'public, max-age=3600, stale-while-revalidate=86400'
+)
+
+# Order list pagination
+ORDERS_PAGE_SIZE = int(os.environ.get('ORDERS_PAGE_SIZE', '100'))
+ORDERS_MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Requests slower than this are logged (0 disables the slow-request log)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+
+# Idempotency-Key handling for POST /api/orders
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', '86400'))  # in seconds
+IDEMPOTENCY_LRU_SIZE = int(os.environ.get('IDEMPOTENCY_LRU_SIZE', '10000'))
+
+# Real-time order feed
+ORDER_EVENTS_BUFFER = int(os.environ.get('ORDER_EVENTS_BUFFER', '1000'))
+ORDER_EVENTS_CHANGE_STREAM = os.environ.get('ORDER_EVENTS_CHANGE_STREAM', 'false').lower() == 'true'
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# Business day boundaries for reports
+REPORTING_TIMEZONE = ZoneInfo(os.environ.get('REPORTING_TIMEZONE', 'Asia/Kolkata'))
+ANALYTICS_CACHE_TTL = float(os.environ.get('ANALYTICS_CACHE_TTL', '60'))  # in seconds
+ANALYTICS_DEFAULT_DAYS = 30
+
+# Token-bucket rate limits: sustained requests per second and burst size
+# per customer phone (orders) or client IP (menu writes); a rate of 0 disables
+ORDER_RATE_LIMIT = float(os.environ.get('ORDER_RATE_LIMIT', '0.2'))
+ORDER_RATE_BURST = int(os.environ.get('ORDER_RATE_BURST', '20'))
+# Orders are also limited per client IP, since the phone is whatever the client sends;
+# the burst is larger because many customers can share one address
+ORDER_IP_RATE_LIMIT = float(os.environ.get('ORDER_IP_RATE_LIMIT', '1'))
+ORDER_IP_RATE_BURST = int(os.environ.get('ORDER_IP_RATE_BURST', '60'))
+MENU_WRITE_RATE_LIMIT = float(os.environ.get('MENU_WRITE_RATE_LIMIT', '5'))
+MENU_WRITE_RATE_BURST = int(os.environ.get('MENU_WRITE_RATE_BURST', '50'))
+# 'memory' limits each worker separately, 'mongo' shares buckets across workers
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+# Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+
+# Kitchen model for order ETAs: parallel stations, units cooked per batch,
+# and how often (seconds) it is rebuilt from the active orders in Mongo
+KITCHEN_STATIONS = int(os.environ.get('KITCHEN_STATIONS', '3'))
+KITCHEN_BATCH_SIZE = int(os.environ.get('KITCHEN_BATCH_SIZE', '4'))
+KITCHEN_RESYNC_SECONDS = float(os.environ.get('KITCHEN_RESYNC_SECONDS', '60'))
+# Orders older than this (hours) are left out of the rebuild even if never closed
+KITCHEN_LOOKBACK_HOURS = float(os.environ.get('KITCHEN_LOOKBACK_HOURS', '4'))
+# Refuse catering orders while each station has more queued work than this (0 disables)
+CATERING_MAX_BACKLOG_MINUTES = float(os.environ.get('CATERING_MAX_BACKLOG_MINUTES', '90'))
+
+# Concurrent requests per worker before new ones get 503 (0 disables)
+MAX_IN_FLIGHT_REQUESTS = int(os.environ.get('MAX_IN_FLIGHT_REQUESTS', '500'))
+
+# Menu item images: 'local' keeps them under IMAGE_DIR and serves them from
+# /api/images, 's3' puts them in IMAGE_S3_BUCKET behind IMAGE_PUBLIC_URL
+IMAGE_STORE = os.environ.get('IMAGE_STORE', 'local')
+IMAGE_DIR = os.environ.get('IMAGE_DIR', str(ROOT_DIR / 'images'))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(10 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))  # resizing processes
+
+# Write-behind order ingestion: when set, new orders are acknowledged once
+# journaled to a file in this directory and flushed to Mongo in batches
+ORDER_JOURNAL_DIR = os.environ.get('ORDER_JOURNAL_DIR', '')
+ORDER_JOURNAL_BATCH_SIZE = int(os.environ.get('ORDER_JOURNAL_BATCH_SIZE', '100'))
+ORDER_JOURNAL_WAIT_SECONDS = 5.0  # status changes wait this long for an unflushed order
+
+# Serve menu and order reads straight from Mongo documents instead of
+# re-validating each one through the pydantic models
+LEAN_READS = os.environ.get('LEAN_READS', 'true').lower() == 'true'
+
+# Responses smaller than this (in bytes) are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1000'))
+
+def use_database(database, menu_database=None):
+    """Point the API at `database` (and `menu_database` for menu reads)"""
+    global db, menu_db
+    db = database
+    menu_db = menu_database or database
+    order_idempotency.collection = db.idempotency_keys
+    for limiter in (order_rate_limiter, order_ip_rate_limiter, menu_write_rate_limiter):
+        if isinstance(limiter, MongoRateLimiter):
+            limiter.collection = db.rate_limits
+
+@asynccontextmanager
+async def lifespan(app):
+    global client, order_journal
+    client = AsyncIOMotorClient(mongo_url, **client_options())
+    use_database(
+        InstrumentedDatabase(client.get_database(DB_NAME, write_concern=orders_write_concern())),
+        InstrumentedDatabase(client.get_database(DB_NAME, read_preference=menu_read_preference())),
+    )
+    try:
+        await ensure_indexes(db)
+    except Exception:
+        # Serve traffic anyway; slow queries beat no queries
+        logger.exception("Failed to ensure MongoDB indexes")
+
+    order_watch_task = None
+    if ORDER_EVENTS_CHANGE_STREAM:
+        order_watch_task = asyncio.create_task(order_hub.watch_changes(db.orders))
+    journal_task = None
+    if ORDER_JOURNAL_DIR:
+        order_journal = OrderJournal(
+            ORDER_JOURNAL_DIR, decode=lambda order: Order(**order).dict(), batch_size=ORDER_JOURNAL_BATCH_SIZE
+        )
+        order_journal.open()
+        journal_task = asyncio.create_task(order_journal.run(db.orders, on_flushed=summarize_orders))
+    kitchen_task = asyncio.create_task(resync_kitchen())
+    menu_version_task = asyncio.create_task(follow_menu_version(
+        db.menu_version, menu_cache.observe_version,
+        poll_interval=MENU_VERSION_POLL_SECONDS, use_change_stream=MENU_VERSION_CHANGE_STREAM,
+    ))
+
+    yield
+
+    if order_watch_task:
+        order_watch_task.cancel()
+    kitchen_task.cancel()
+    menu_version_task.cancel()
+    image_processor.shutdown()
+    if journal_task:
+        # Unflushed orders stay in the journal and are replayed on the next start
+        journal_task.cancel()
+        order_journal.close()
+    client.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Shriyansh Restaurant API", version="1.0.0")
+app = FastAPI(
+    title="Shriyansh Restaurant API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -48,6 +230,7 @@ class MenuItem(BaseModel):
     preparation_time: int = 15  # in minutes
     ingredients: List[str] = []
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, str]] = None  # e.g. "thumb.webp" -> URL, set by image uploads
 
 class MenuItemCreate(BaseModel):
     name: str
@@ -60,6 +243,24 @@ class MenuItemCreate(BaseModel):
     ingredients: List[str] = []
     image_url: Optional[str] = None
 
+class MenuItemUpsert(MenuItemCreate):
+    id: Optional[str] = None  # generated when missing
+
+class MenuBulkUpsert(BaseModel):
+    items: List[MenuItemUpsert]
+    prune: bool = False  # delete items not present in this batch
+
+class MenuBulkResult(BaseModel):
+    upserted: int
+    modified: int
+    deleted: int
+    ids: List[str]
+
+class MenuSearchResult(BaseModel):
+    items: List[MenuItem]
+    total: int
+    facets: dict
+
 class RestaurantInfo(BaseModel):
     name: str = "Shriyansh Restaurant"
     description: str = "Authentic Pure Vegetarian Indian Cuisine"
@@ -78,24 +279,75 @@ class RestaurantInfo(BaseModel):
     services: List[str] = ["Takeout", "Delivery", "Catering"]
     specialties: List[str] = ["Pure Vegetarian", "North Indian", "Traditional Recipes"]
 
+# RestaurantInfo is constant, so serialize it once
+RESTAURANT_INFO = RestaurantInfo().dict()
+RESTAURANT_INFO_BODY = CachedBody.from_data(RESTAURANT_INFO)
+
+class OrderStatus(str, Enum):
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    PREPARING = "preparing"
+    READY = "ready"
+    DELIVERED = "delivered"
+
+# Allowed status changes: current status -> next statuses
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED},
+    OrderStatus.CONFIRMED: {OrderStatus.PREPARING},
+    OrderStatus.PREPARING: {OrderStatus.READY},
+    OrderStatus.READY: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: set(),
+}
+ACTIVE_ORDER_STATUSES = [status.value for status in OrderStatus if status != OrderStatus.DELIVERED]
+# Orders still taking up kitchen time
+KITCHEN_ORDER_STATUSES = [OrderStatus.PENDING.value, OrderStatus.CONFIRMED.value, OrderStatus.PREPARING.value]
+
+def statuses_leading_to(status: OrderStatus) -> List[OrderStatus]:
+    """Statuses an order may be in to move to `status`"""
+    return [current for current, targets in ORDER_TRANSITIONS.items() if status in targets]
+
 class OrderItem(BaseModel):
     menu_item_id: str
     quantity: int
     special_instructions: str = ""
 
+class OrderLine(OrderItem):
+    # Snapshot of the menu item when the order was placed; None on older orders
+    name: Optional[str] = None
+    unit_price: Optional[float] = None
+    line_total: Optional[float] = None
+    preparation_time: Optional[int] = None  # in minutes
+    category: Optional[str] = None
+
 class Order(BaseModel):
+    # Store status as its plain string value in Mongo
+    model_config = ConfigDict(use_enum_values=True, validate_default=True)
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     customer_name: str
     customer_phone: str
     customer_email: str = ""
-    items: List[OrderItem]
+    items: List[OrderLine]
     total_amount: float
     order_type: str  # "takeout", "delivery", "catering"
-    status: str = "pending"  # "pending", "confirmed", "preparing", "ready", "delivered"
+    status: OrderStatus = OrderStatus.PENDING
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+    estimated_ready_at: Optional[datetime] = None
     delivery_address: str = ""
     special_notes: str = ""
 
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+    expected_status: Optional[OrderStatus] = None  # fail unless the order is still in this status
+
+class BulkOrderStatusUpdate(OrderStatusUpdate):
+    order_ids: List[str]
+
+class BulkOrderStatusResult(BaseModel):
+    updated: List[Order]
+    failed: dict  # order id -> reason
+
 class OrderCreate(BaseModel):
     customer_name: str
     customer_phone: str
@@ -105,92 +357,751 @@ class OrderCreate(BaseModel):
     delivery_address: str = ""
     special_notes: str = ""
 
+LEAN_MENU_ITEM = LeanModel(MenuItem)
+LEAN_ORDER = LeanModel(Order, nested={"items": LeanModel(OrderLine)})
+
+async def load_menu_items(after_write=False):
+    """Load every menu item for the menu cache"""
+    # Right after a menu write only the primary is sure to have it
+    source = db if after_write else menu_db
+    if LEAN_READS:
+        menu_items = await source.menu_items.find({}, LEAN_MENU_ITEM.projection).to_list(1000)
+        return [LEAN_MENU_ITEM.complete(item) for item in menu_items]
+    menu_items = await source.menu_items.find({}, {"_id": 0}).to_list(1000)
+    return [MenuItem(**item).dict() for item in menu_items]
+
+menu_cache = MenuCache(load_menu_items, ttl=MENU_CACHE_TTL)
+menu_search_index = MenuSearchIndex()
+
+if IMAGE_STORE == 's3':
+    image_store = S3ImageStore(
+        os.environ['IMAGE_S3_BUCKET'], os.environ['IMAGE_PUBLIC_URL'],
+        prefix=os.environ.get('IMAGE_S3_PREFIX', '')
+    )
+else:
+    image_store = LocalImageStore(IMAGE_DIR)
+image_processor = ImageProcessor(image_store, workers=IMAGE_WORKERS)
+
+async def menu_changed():
+    """Publish a menu write to this worker now and to the others via the shared version"""
+    menu_cache.observe_version(await bump_menu_version(db.menu_version))
+order_hub = OrderEventHub(buffer_size=ORDER_EVENTS_BUFFER)
+order_reads = SingleFlight("order")
+order_journal = None  # OrderJournal when ORDER_JOURNAL_DIR is set (see lifespan)
+analytics_cache = ResultCache(ttl=ANALYTICS_CACHE_TTL)
+kitchen = KitchenSchedule(stations=KITCHEN_STATIONS, batch_size=KITCHEN_BATCH_SIZE)
+
+async def resync_kitchen():
+    """Periodically rebuild the kitchen model from the orders still being cooked"""
+    while True:
+        try:
+            # Stale orders are often never moved past "pending"; they are not being cooked
+            now = datetime.utcnow()
+            kitchen.begin_rebuild()
+            orders = await db.orders.find(
+                {
+                    "status": {"$in": KITCHEN_ORDER_STATUSES},
+                    "created_at": {"$gte": now - timedelta(hours=KITCHEN_LOOKBACK_HOURS)},
+                },
+                {"_id": 0, "id": 1, "created_at": 1, "items.quantity": 1, "items.preparation_time": 1}
+            ).to_list(None)
+            kitchen.rebuild(orders, now)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to rebuild the kitchen schedule")
+        await asyncio.sleep(KITCHEN_RESYNC_SECONDS)
+
+# Limiters are None when their rate is 0
+def make_rate_limiter(rate, burst):
+    if rate <= 0:
+        return None
+    if RATE_LIMIT_BACKEND == 'mongo':
+        return MongoRateLimiter(None, rate, burst)  # collection set by use_database
+    return MemoryRateLimiter(rate, burst)
+
+order_rate_limiter = make_rate_limiter(ORDER_RATE_LIMIT, ORDER_RATE_BURST)
+order_ip_rate_limiter = make_rate_limiter(ORDER_IP_RATE_LIMIT, ORDER_IP_RATE_BURST)
+menu_write_rate_limiter = make_rate_limiter(MENU_WRITE_RATE_LIMIT, MENU_WRITE_RATE_BURST)
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+async def limit_menu_writes(request: Request):
+    await enforce(menu_write_rate_limiter, f"menu:{client_ip(request)}")
+
+async def limit_orders(request: Request, order: OrderCreate):
+    await enforce(order_ip_rate_limiter, f"order-ip:{client_ip(request)}")
+    await enforce(order_rate_limiter, f"order:{order.customer_phone}")
+
+# The collection is assigned by use_database() once the client exists
+order_idempotency = IdempotencyStore(
+    None, ttl_seconds=IDEMPOTENCY_TTL, lru_size=IDEMPOTENCY_LRU_SIZE
+)
+
 # Restaurant API Routes
 @api_router.get("/")
 async def root():
     return {"message": "Welcome to Shriyansh Restaurant API"}
 
 @api_router.get("/restaurant-info", response_model=RestaurantInfo)
-async def get_restaurant_info():
+async def get_restaurant_info(request: Request):
     """Get restaurant information"""
-    return RestaurantInfo()
+    return cached_response(
+        request, RESTAURANT_INFO_BODY, INFO_CACHE_CONTROL, min_compress_size=COMPRESSION_MIN_SIZE
+    )
 
 @api_router.get("/menu", response_model=List[MenuItem])
-async def get_menu():
+async def get_menu(request: Request):
     """Get all menu items"""
-    menu_items = await db.menu_items.find().to_list(1000)
-    return [MenuItem(**item) for item in menu_items]
+    snapshot = await menu_cache.get()
+    return cached_response(
+        request, snapshot.body, MENU_CACHE_CONTROL, min_compress_size=COMPRESSION_MIN_SIZE
+    )
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(request: Request, version: Optional[str] = None):
+    """
+    Everything the storefront needs on first load, in one response.
+
+    Clients send back the `version` they already hold; if it is still
+    current the reply is just {"version": ..., "unchanged": true}.
+    """
+    snapshot = await menu_cache.get()
+    current, body, unchanged = snapshot.bootstrap(RESTAURANT_INFO, list(MenuCategory))
+    return cached_response(
+        request, unchanged if version == current else body, MENU_CACHE_CONTROL,
+        min_compress_size=COMPRESSION_MIN_SIZE
+    )
+
+@api_router.get("/menu/search", response_model=MenuSearchResult)
+async def search_menu(
+    q: str = "",
+    category: Optional[MenuCategory] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_spicy: Optional[bool] = None,
+    is_available: Optional[bool] = None,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Search menu items by name, description and ingredients"""
+    snapshot = await menu_cache.get()
+    menu_search_index.sync(snapshot)
+    return menu_search_index.search(
+        q, category=category, min_price=min_price, max_price=max_price,
+        is_spicy=is_spicy, is_available=is_available, limit=limit
+    )
 
 @api_router.get("/menu/category/{category}", response_model=List[MenuItem])
-async def get_menu_by_category(category: MenuCategory):
+async def get_menu_by_category(category: MenuCategory, request: Request):
     """Get menu items by category"""
-    menu_items = await db.menu_items.find({"category": category.value}).to_list(1000)
-    return [MenuItem(**item) for item in menu_items]
+    snapshot = await menu_cache.get()
+    return cached_response(
+        request, snapshot.category_body(category), MENU_CACHE_CONTROL,
+        min_compress_size=COMPRESSION_MIN_SIZE
+    )
 
 @api_router.post("/menu", response_model=MenuItem)
-async def create_menu_item(item: MenuItemCreate):
+async def create_menu_item(item: MenuItemCreate, request: Request):
     """Create a new menu item"""
+    await limit_menu_writes(request)
     menu_item = MenuItem(**item.dict())
     await db.menu_items.insert_one(menu_item.dict())
+    await menu_changed()
     return menu_item
 
+@api_router.post("/menu/bulk", response_model=MenuBulkResult)
+async def bulk_upsert_menu(batch: MenuBulkUpsert, request: Request):
+    """Create or update many menu items in one round trip"""
+    await limit_menu_writes(request)
+    if len(batch.items) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 items per batch")
+    if batch.prune and not batch.items:
+        raise HTTPException(status_code=400, detail="prune requires at least one item in the batch")
+    items = []
+    for item in batch.items:
+        data = item.dict()
+        if not data["id"]:
+            del data["id"]
+        stored = MenuItem(**data).dict()
+        if "image_url" not in item.model_fields_set:
+            # Leave the stored image alone unless the batch sets one
+            del stored["image_url"]
+        items.append(stored)
+
+    result = await bulk_upsert_menu_items(db, items, prune=batch.prune)
+    await menu_changed()
+    return MenuBulkResult(**result, ids=[item["id"] for item in items])
+
 @api_router.put("/menu/{item_id}", response_model=MenuItem)
-async def update_menu_item(item_id: str, item: MenuItemCreate):
+async def update_menu_item(item_id: str, item: MenuItemCreate, request: Request):
     """Update a menu item"""
+    await limit_menu_writes(request)
+    fields = item.dict()
+    # image_variants belong to the uploaded image; keep them only while image_url still points at it
     updated_item = await db.menu_items.find_one_and_update(
-        {"id": item_id},
-        {"$set": item.dict()},
+        {"id": item_id, "image_url": fields["image_url"]},
+        {"$set": fields},
         return_document=True
     )
+    if not updated_item:
+        updated_item = await db.menu_items.find_one_and_update(
+            {"id": item_id},
+            {"$set": {**fields, "image_variants": None}},
+            return_document=True
+        )
     if not updated_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    await menu_changed()
     return MenuItem(**updated_item)
 
 @api_router.delete("/menu/{item_id}")
-async def delete_menu_item(item_id: str):
+async def delete_menu_item(item_id: str, request: Request):
     """Delete a menu item"""
+    await limit_menu_writes(request)
     result = await db.menu_items.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    await menu_changed()
     return {"message": "Menu item deleted successfully"}
 
+@api_router.post("/menu/{item_id}/image", response_model=MenuItem)
+async def upload_menu_item_image(item_id: str, request: Request, image: UploadFile = File(...)):
+    """
+    Upload a photo for a menu item.
+
+    Resized WebP and JPEG variants are generated once per distinct image
+    and linked from image_url (the card-sized WebP) and image_variants.
+    """
+    await limit_menu_writes(request)
+    if not image_processor.available:
+        raise HTTPException(status_code=503, detail="Image processing is not available")
+    data = await image.read(IMAGE_MAX_BYTES + 1)
+    if len(data) > IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Images must be at most {IMAGE_MAX_BYTES} bytes")
+    if not await db.menu_items.find_one({"id": item_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
+    try:
+        urls = await image_processor.process(data)
+    except InvalidImage:
+        raise HTTPException(status_code=400, detail="The upload is not a supported image")
+
+    updated_item = await db.menu_items.find_one_and_update(
+        {"id": item_id},
+        {"$set": {"image_url": urls[DEFAULT_VARIANT], "image_variants": urls}},
+        projection={"_id": 0},
+        return_document=True
+    )
+    if not updated_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    await menu_changed()
+    return MenuItem(**updated_item)
+
+@api_router.get("/images/{key:path}", include_in_schema=False)
+async def get_image(key: str):
+    """Serve a stored image; URLs are content-hashed, so they never change"""
+    if not isinstance(image_store, LocalImageStore) or not KEY_PATTERN.match(key):
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = image_store.path(key)
+    if not await asyncio.to_thread(os.path.isfile, path):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type=key_content_type(key), headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
 @api_router.post("/orders", response_model=Order)
-async def create_order(order: OrderCreate):
-    """Create a new order"""
-    # Calculate total amount
-    total_amount = 0.0
+async def create_order(
+    order: OrderCreate,
+    request: Request,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    Create a new order.
+
+    Clients may send an Idempotency-Key header; retries with the same key
+    return the original order (marked Idempotent-Replayed) without
+    creating another one.
+
+    With ORDER_JOURNAL_DIR set, orders without a key are accepted while
+    Mongo is unreachable. Keyed orders are not: keys are shared between
+    workers through Mongo, so those get 503 and should be retried.
+    """
+    if not idempotency_key:
+        await limit_orders(request, order)
+        return await place_order(order)
+    if len(idempotency_key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+
+    async def place():
+        # Only requests that create an order spend a token; replays of a stored key are free
+        await limit_orders(request, order)
+        return (await place_order(order)).dict()
+
+    try:
+        stored, replayed = await order_idempotency.run(idempotency_key, fingerprint(order.dict()), place)
+    except ConnectionFailure:
+        raise HTTPException(
+            status_code=503,
+            detail="Orders with an Idempotency-Key cannot be accepted right now, please retry",
+            headers={"Retry-After": "5"},
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return Order(**stored)
+
+async def find_order_menu_items(item_ids: List[str]) -> dict:
+    """Menu items to price an order with, by id"""
+    source = db
+    if order_journal:
+        # Journaled orders must not wait on the primary: use the cached menu,
+        # or the menu read preference for items it does not hold yet
+        snapshot = menu_cache.peek()
+        if snapshot and all(item_id in snapshot.by_id for item_id in item_ids):
+            return {item_id: snapshot.by_id[item_id] for item_id in item_ids}
+        source = menu_db
+    # Resolve every line item in a single round trip
+    menu_items = await source.menu_items.find(
+        {"id": {"$in": item_ids}},
+        {"_id": 0, "id": 1, "name": 1, "price": 1, "is_available": 1, "preparation_time": 1, "category": 1}
+    ).to_list(len(item_ids))
+    return {menu_item["id"]: menu_item for menu_item in menu_items}
+
+async def place_order(order: OrderCreate) -> Order:
+    """Price, validate and store an order"""
+    item_ids = list({item.menu_item_id for item in order.items})
+    menu_by_id = await find_order_menu_items(item_ids)
+
+    unknown = [item_id for item_id in item_ids if item_id not in menu_by_id]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown menu items: {', '.join(unknown)}")
+    unavailable = [item_id for item_id in item_ids if not menu_by_id[item_id].get("is_available", True)]
+    if unavailable:
+        raise HTTPException(status_code=400, detail=f"Menu items not available: {', '.join(unavailable)}")
+
+    # Snapshot name, price and category so later menu edits don't change this order
+    lines = []
     for item in order.items:
-        menu_item = await db.menu_items.find_one({"id": item.menu_item_id})
-        if menu_item:
-            total_amount += menu_item["price"] * item.quantity
-    
-    order_obj = Order(**order.dict(), total_amount=total_amount)
-    await db.orders.insert_one(order_obj.dict())
+        menu_item = menu_by_id[item.menu_item_id]
+        lines.append(OrderLine(
+            **item.dict(),
+            name=menu_item["name"],
+            unit_price=menu_item["price"],
+            line_total=round(menu_item["price"] * item.quantity, 2),
+            preparation_time=menu_item.get("preparation_time"),
+            # Cached menu items may hold the MenuCategory enum
+            category=getattr(menu_item.get("category"), "value", menu_item.get("category")),
+        ))
+    total_amount = round(sum(line.line_total for line in lines), 2)
+
+    order_obj = Order(**order.dict(exclude={"items"}), items=lines, total_amount=total_amount)
+    if order_obj.order_type == "catering" and CATERING_MAX_BACKLOG_MINUTES:
+        excess = kitchen.backlog(order_obj.created_at) - timedelta(minutes=CATERING_MAX_BACKLOG_MINUTES)
+        if excess > timedelta(0):
+            raise HTTPException(
+                status_code=503,
+                detail="The kitchen is at capacity for catering orders right now",
+                headers={"Retry-After": str(math.ceil(excess.total_seconds()))},
+            )
+    order_obj.estimated_ready_at = kitchen.schedule(
+        order_obj.id, [line.dict() for line in lines], order_obj.created_at
+    )
+    if order_journal:
+        # Mongo keeps milliseconds; match it so the journaled copy sorts the same
+        order_obj.created_at = order_obj.created_at.replace(
+            microsecond=order_obj.created_at.microsecond // 1000 * 1000
+        )
+    order_doc = order_obj.dict()
+    try:
+        if order_journal:
+            await order_journal.append(order_doc)
+        else:
+            # insert_one adds an ObjectId _id to the dict it is given; keep ours clean
+            await db.orders.insert_one(dict(order_doc))
+    except Exception:
+        kitchen.complete(order_obj.id, order_obj.created_at)
+        raise
+    if not order_journal:
+        # Journaled orders are summarized when they are flushed
+        await summarize_orders([order_doc])
+    order_hub.notify("order.created", order_doc)
     return order_obj
 
+async def summarize_orders(orders: List[dict]):
+    """Add newly stored orders to their daily summaries"""
+    for order_doc in orders:
+        try:
+            await record_order(db.order_daily_summary, order_doc, REPORTING_TIMEZONE)
+        except Exception:
+            # The order is placed; the summary can be rebuilt with order_summary.py --rebuild
+            logger.exception("Failed to update daily summary for order %s", order_doc["id"])
+
+def as_naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; bring client-supplied ones to match"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def encode_order_cursor(order: dict) -> str:
+    """Opaque keyset cursor pointing just past `order`"""
+    raw = json.dumps({"created_at": order["created_at"].isoformat(), "id": order["id"]})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_order_cursor(cursor: str) -> dict:
+    """Turn a cursor back into a (created_at, id) keyset condition"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = as_naive_utc(datetime.fromisoformat(raw["created_at"]))
+        order_id = raw["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": order_id}},
+    ]}
+
+def build_order_filter(
+    status: Optional[OrderStatus] = None,
+    order_type: Optional[str] = None,
+    customer_phone: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> dict:
+    """Mongo filter for the order list query parameters"""
+    query = {}
+    if status:
+        query["status"] = status.value
+    if order_type:
+        query["order_type"] = order_type
+    if customer_phone:
+        query["customer_phone"] = customer_phone
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = as_naive_utc(created_from)
+        if created_to:
+            query["created_at"]["$lt"] = as_naive_utc(created_to)
+    return query
+
 @api_router.get("/orders", response_model=List[Order])
-async def get_orders():
-    """Get all orders"""
-    orders = await db.orders.find().sort("created_at", -1).to_list(1000)
+async def get_orders(
+    response: Response,
+    limit: int = Query(ORDERS_PAGE_SIZE, ge=1, le=ORDERS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[OrderStatus] = None,
+    order_type: Optional[str] = None,
+    customer_phone: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    Get orders, newest first.
+
+    Pages are keyed on (created_at, id); when more orders remain the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    Unflushed journaled orders are listed only by the worker holding them.
+    """
+    query = build_order_filter(status, order_type, customer_phone, created_from, created_to)
+    if cursor:
+        query = {"$and": [query, decode_order_cursor(cursor)]}
+
+    projection = LEAN_ORDER.projection if LEAN_READS else {"_id": 0}
+    orders = await db.orders.find(query, projection).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    if order_journal and order_journal.pending:
+        # Orders acknowledged but not flushed yet belong in the list too
+        stored_ids = {order["id"] for order in orders}
+        unflushed = [order for order in order_journal.find(query) if order["id"] not in stored_ids]
+        orders = sorted(
+            orders + unflushed, key=lambda order: (order["created_at"], order["id"]), reverse=True
+        )[:limit + 1]
+    headers = {}
+    if len(orders) > limit:
+        orders = orders[:limit]
+        headers["X-Next-Cursor"] = encode_order_cursor(orders[-1])
+    if LEAN_READS:
+        return ORJSONResponse([LEAN_ORDER.complete(order) for order in orders], headers=headers)
+    response.headers.update(headers)
+    return [Order(**order) for order in orders]
+
+@api_router.get("/orders/export")
+async def export_orders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[OrderStatus] = None,
+    order_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Stream every matching order as NDJSON or CSV, oldest first"""
+    media_type, header, serialize = EXPORT_FORMATS[format]
+    query = build_order_filter(status, order_type, None, created_from, created_to)
+    cursor = db.orders.find(query, {"_id": 0}).sort(
+        [("created_at", 1), ("id", 1)]
+    ).batch_size(EXPORT_BATCH_SIZE)
+
+    async def rows():
+        if header:
+            yield header()
+        async for order in cursor:
+            yield serialize(Order(**order).dict())
+
+    filename = f"orders-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@api_router.get("/orders/stream")
+async def stream_orders(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[str] = Query(None, description="Resume after this event id"),
+):
+    """
+    Server-Sent Events feed of order creations and status changes.
+
+    Reconnecting clients send Last-Event-ID (EventSource does this
+    automatically) and receive only the events they missed. A `reset`
+    event means the gap is no longer buffered (or the id was issued by
+    another worker or before a restart) and the client should reload
+    GET /api/orders.
+    """
+    subscription, complete = order_hub.subscribe(last_event_id or since)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            if not complete:
+                yield "event: reset\ndata: {}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield event.to_sse()
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/orders/active", response_model=List[Order])
+async def get_active_orders(limit: int = Query(ORDERS_MAX_PAGE_SIZE, ge=1, le=ORDERS_MAX_PAGE_SIZE)):
+    """
+    Orders that are not delivered yet, oldest first (kitchen queue).
+
+    Unflushed journaled orders are listed only by the worker holding them.
+    """
+    query = {"status": {"$in": ACTIVE_ORDER_STATUSES}}
+    orders = await db.orders.find(query, {"_id": 0}).sort("created_at", 1).limit(limit).to_list(limit)
+    if order_journal and order_journal.pending:
+        stored_ids = {order["id"] for order in orders}
+        unflushed = [order for order in order_journal.find(query) if order["id"] not in stored_ids]
+        orders = sorted(orders + unflushed, key=lambda order: order["created_at"])[:limit]
     return [Order(**order) for order in orders]
 
+async def transition_order_status(order_id: str, update: OrderStatusUpdate) -> Order:
+    """
+    Atomically move one order to `update.status`.
+
+    The status precondition is part of the update filter, so two
+    terminals racing on the same order cannot both succeed. With
+    ORDER_JOURNAL_DIR set, an order that is not in Mongo yet gets 503 and
+    can be retried. That holds if this worker or another worker on the
+    same host journaled it. Orders journaled on another host get 404
+    until they are flushed.
+    """
+    allowed_from = statuses_leading_to(update.status)
+    if update.expected_status is not None:
+        if update.expected_status not in allowed_from:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot move an order from {update.expected_status.value} to {update.status.value}"
+            )
+        allowed_from = [update.expected_status]
+
+    if order_journal and order_id in order_journal.pending:
+        if not await order_journal.wait_flushed(order_id, ORDER_JOURNAL_WAIT_SECONDS):
+            raise HTTPException(
+                status_code=503, detail="Order is still being saved", headers={"Retry-After": "1"}
+            )
+
+    changes = {"status": update.status.value, "updated_at": datetime.utcnow()}
+    previous = await db.orders.find_one_and_update(
+        {"id": order_id, "status": {"$in": [status.value for status in allowed_from]}},
+        {"$set": changes},
+        projection={"_id": 0}
+    )
+    if previous:
+        if update.status.value not in KITCHEN_ORDER_STATUSES:
+            kitchen.complete(order_id, changes["updated_at"])
+        updated_order = Order(**{**previous, **changes})
+        order_hub.notify("order.updated", updated_order.dict())
+        return updated_order
+
+    current = await db.orders.find_one({"id": order_id}, {"_id": 0, "status": 1})
+    if not current:
+        if order_journal and await order_journal.find_sibling(order_id):
+            # Journaled by another worker on this host and not flushed yet
+            raise HTTPException(
+                status_code=503, detail="Order is still being saved", headers={"Retry-After": "1"}
+            )
+        raise HTTPException(status_code=404, detail="Order not found")
+    raise HTTPException(
+        status_code=409,
+        detail=f"Order is {current['status']}; cannot move it to {update.status.value}"
+    )
+
+@api_router.patch("/orders/status", response_model=BulkOrderStatusResult)
+async def bulk_update_order_status(update: BulkOrderStatusUpdate):
+    """Move a batch of orders to the same status, e.g. mark them all ready"""
+    order_ids = list(dict.fromkeys(update.order_ids))
+    if len(order_ids) > 200:
+        raise HTTPException(status_code=400, detail="At most 200 orders per batch")
+
+    single_update = OrderStatusUpdate(status=update.status, expected_status=update.expected_status)
+    results = await asyncio.gather(
+        *(transition_order_status(order_id, single_update) for order_id in order_ids),
+        return_exceptions=True
+    )
+    updated, failed = [], {}
+    for order_id, result in zip(order_ids, results):
+        if isinstance(result, HTTPException):
+            failed[order_id] = result.detail
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            updated.append(result)
+    return BulkOrderStatusResult(updated=updated, failed=failed)
+
+@api_router.patch("/orders/{order_id}/status", response_model=Order)
+async def update_order_status(order_id: str, update: OrderStatusUpdate):
+    """Move an order to its next status"""
+    return await transition_order_status(order_id, update)
+
+@api_router.get("/kitchen/load")
+async def get_kitchen_load():
+    """Current kitchen backlog as seen by this worker"""
+    return kitchen.load(datetime.utcnow())
+
+@api_router.get("/analytics/daily-summary")
+async def get_daily_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+):
+    """Per-day revenue, order counts by order type and top items"""
+    query = {}
+    if date_from or date_to:
+        query["_id"] = {}
+        if date_from:
+            query["_id"]["$gte"] = date_from.isoformat()
+        if date_to:
+            query["_id"]["$lte"] = date_to.isoformat()
+    summaries = await db.order_daily_summary.find(query).sort("_id", 1).to_list(1000)
+    return [summary_view(summary, top) for summary in summaries]
+
+def analytics_range(date_from: Optional[date], date_to: Optional[date]) -> dict:
+    """created_at filter for a business-day range, defaulting to the last 30 days"""
+    date_to = date_to or datetime.now(REPORTING_TIMEZONE).date()
+    date_from = date_from or date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return created_at_range(date_from, date_to, REPORTING_TIMEZONE)
+
+async def run_report(name: str, pipeline: list, params: tuple):
+    async def compute():
+        return round_amounts(await db.orders.aggregate(pipeline).to_list(None))
+    return await analytics_cache.get((name,) + params, compute)
+
+@api_router.get("/analytics/revenue")
+async def get_revenue(
+    granularity: str = Query("day", pattern="^(day|hour)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """Revenue and order count per day or per hour"""
+    match = analytics_range(date_from, date_to)
+    pipeline = revenue_pipeline(match, granularity, REPORTING_TIMEZONE)
+    return await run_report("revenue", pipeline, (granularity, date_from, date_to))
+
+@api_router.get("/analytics/best-sellers")
+async def get_best_sellers(
+    category: Optional[MenuCategory] = None,
+    limit: int = Query(5, ge=1, le=50),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """Best-selling menu items per menu category"""
+    match = analytics_range(date_from, date_to)
+    pipeline = best_sellers_pipeline(match, limit, category.value if category else None)
+    return await run_report("best-sellers", pipeline, (category, limit, date_from, date_to))
+
+@api_router.get("/analytics/ticket-size")
+async def get_ticket_size(date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Average ticket size and order count per order type"""
+    match = analytics_range(date_from, date_to)
+    return await run_report("ticket-size", ticket_size_pipeline(match), (date_from, date_to))
+
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str):
-    """Get specific order"""
-    order = await db.orders.find_one({"id": order_id})
+    """
+    Get specific order.
+
+    Unflushed journaled orders are found if this worker or another worker
+    on the same host holds them, but not if another host does.
+    """
+    projection = LEAN_ORDER.projection if LEAN_READS else {"_id": 0}
+    order = order_journal.pending.get(order_id) if order_journal else None
+    if order is None:
+        order = await order_reads.do(order_id, lambda: db.orders.find_one({"id": order_id}, projection))
+    if not order and order_journal:
+        order = await order_journal.find_sibling(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    if LEAN_READS:
+        return ORJSONResponse(LEAN_ORDER.complete(order))
     return Order(**order)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+app.add_middleware(
+    LoadSheddingMiddleware,
+    max_in_flight=MAX_IN_FLIGHT_REQUESTS,
+    exempt_paths=["/api/orders/stream", "/metrics"],
+)
+
+app.add_middleware(MetricsMiddleware, slow_request_ms=SLOW_REQUEST_MS)
+
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the order list's pagination cursor
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -199,7 +1110,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
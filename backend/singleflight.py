@@ -0,0 +1,36 @@
+"""
+Request coalescing: concurrent identical reads share one in-flight call
+"""
+import asyncio
+
+from metrics import registry
+
+SINGLEFLIGHT_REQUESTS = registry.counter(
+    "singleflight_requests_total",
+    "Reads served by a single-flight group, by whether they ran the call or joined one",
+    ("group", "result"),
+)
+
+
+class SingleFlight:
+    """
+    `await flight.do(key, fn)` runs `fn()` once per key at a time; callers
+    arriving while it is in flight await the same result. The call runs as
+    its own task, so a caller that disconnects does not cancel it for the
+    others.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self._calls = {}
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_REQUESTS.inc((self.group, "leader"))
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            SINGLEFLIGHT_REQUESTS.inc((self.group, "coalesced"))
+        return await asyncio.shield(task)
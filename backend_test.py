@@ -1,6 +1,9 @@
 import requests
+import base64
 import json
+import time
 import unittest
+import uuid
 import os
 from dotenv import load_dotenv
 import sys
@@ -145,6 +148,387 @@ class TestShriyanshRestaurantAPI(unittest.TestCase):
         # There should be at least one order (the one we just created)
         self.assertGreaterEqual(len(data), 1)
         print(f"✅ Get all orders test passed (found {len(data)} orders)")
+    
+    def test_08_menu_update_invalidates_cache(self):
+        """Test that menu writes are visible on the next menu read"""
+        item_id = self.test_03_create_menu_item()
+        updated_item = {
+            "name": "Paneer Tikka",
+            "description": "Marinated cottage cheese cubes grilled to perfection",
+            "price": 275.0,
+            "category": "appetizers"
+        }
+        response = requests.put(f"{API_URL}/menu/{item_id}", json=updated_item)
+        self.assertEqual(response.status_code, 200)
+
+        response = requests.get(f"{API_URL}/menu/category/appetizers")
+        prices = {item["id"]: item["price"] for item in response.json()}
+        self.assertEqual(prices.get(item_id), 275.0)
+
+        response = requests.delete(f"{API_URL}/menu/{item_id}")
+        self.assertEqual(response.status_code, 200)
+        response = requests.get(f"{API_URL}/menu")
+        self.assertNotIn(item_id, [item["id"] for item in response.json()])
+        print("✅ Menu cache invalidation test passed")
+    
+    def test_09_conditional_get(self):
+        """Test ETag / If-None-Match on menu and restaurant info"""
+        for path in ["/menu", "/menu/category/appetizers", "/restaurant-info"]:
+            response = requests.get(f"{API_URL}{path}")
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers.get("ETag")
+            self.assertTrue(etag)
+            self.assertIn("max-age", response.headers.get("Cache-Control", ""))
+
+            response = requests.get(f"{API_URL}{path}", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+        # Differently encoded bodies must not share a strong ETag
+        etags = {
+            requests.get(f"{API_URL}/menu", headers={"Accept-Encoding": encoding}).headers["ETag"]
+            for encoding in ("gzip", "identity")
+        }
+        self.assertEqual(len(etags), 2)
+        print("✅ Conditional GET test passed")
+    
+    def test_10_create_order_unknown_item(self):
+        """Test that orders with unknown menu items are rejected"""
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": "+91-9876543210",
+            "order_type": "takeout",
+            "items": [{"menu_item_id": "does-not-exist", "quantity": 1}]
+        }
+        response = requests.post(f"{API_URL}/orders", json=test_order)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("does-not-exist", response.json()["detail"])
+        print("✅ Unknown menu item order rejection test passed")
+    
+    def test_11_orders_pagination(self):
+        """Test keyset pagination and filters on the order list"""
+        response = requests.get(f"{API_URL}/orders", params={"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertLessEqual(len(first_page), 1)
+
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor:
+            response = requests.get(f"{API_URL}/orders", params={"limit": 1, "cursor": cursor})
+            self.assertEqual(response.status_code, 200)
+            second_page = response.json()
+            self.assertEqual(len(second_page), 1)
+            self.assertNotEqual(first_page[0]["id"], second_page[0]["id"])
+
+        response = requests.get(f"{API_URL}/orders", params={"order_type": "delivery"})
+        for order in response.json():
+            self.assertEqual(order["order_type"], "delivery")
+
+        response = requests.get(f"{API_URL}/orders", params={"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+        # Browsers only let scripts read the cursor header if CORS exposes it
+        response = requests.get(f"{API_URL}/orders", params={"limit": 1}, headers={"Origin": "http://example.com"})
+        self.assertIn("X-Next-Cursor", response.headers.get("Access-Control-Expose-Headers", ""))
+        print("✅ Order pagination test passed")
+    
+    def test_12_export_orders(self):
+        """Test the streaming NDJSON and CSV order export"""
+        response = requests.get(f"{API_URL}/orders/export")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("application/x-ndjson", response.headers["Content-Type"])
+        for line in response.text.splitlines():
+            self.assertIn("id", json.loads(line))
+
+        response = requests.get(f"{API_URL}/orders/export", params={"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.text.startswith("id,created_at,status"))
+        print("✅ Order export test passed")
+    
+    def test_13_bulk_upsert_menu(self):
+        """Test bulk upserting menu items keyed on id"""
+        batch = {
+            "items": [
+                {
+                    "id": "test-bulk-001",
+                    "name": "Masala Chai",
+                    "description": "Spiced milk tea",
+                    "price": 30.0,
+                    "category": "beverages"
+                }
+            ]
+        }
+        response = requests.post(f"{API_URL}/menu/bulk", json=batch)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["ids"], ["test-bulk-001"])
+
+        batch["items"][0]["price"] = 35.0
+        response = requests.post(f"{API_URL}/menu/bulk", json=batch)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["upserted"], 0)
+
+        response = requests.get(f"{API_URL}/menu/category/beverages")
+        prices = {item["id"]: item["price"] for item in response.json()}
+        self.assertEqual(prices.get("test-bulk-001"), 35.0)
+
+        # A bulk write that sets image_url changes it, as PUT does
+        batch["items"][0]["image_url"] = "https://example.com/chai.jpg"
+        requests.post(f"{API_URL}/menu/bulk", json=batch)
+        response = requests.get(f"{API_URL}/menu/category/beverages")
+        images = {item["id"]: item["image_url"] for item in response.json()}
+        self.assertEqual(images.get("test-bulk-001"), "https://example.com/chai.jpg")
+
+        # Pruning against an empty batch would wipe the whole menu
+        response = requests.post(f"{API_URL}/menu/bulk", json={"items": [], "prune": True})
+        self.assertEqual(response.status_code, 400)
+
+        requests.delete(f"{API_URL}/menu/test-bulk-001")
+        print("✅ Bulk menu upsert test passed")
+    
+    def test_14_search_menu(self):
+        """Test full-text and faceted menu search"""
+        item_id = self.test_03_create_menu_item()
+        response = requests.get(f"{API_URL}/menu/search", params={"q": "paneer tik"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn(item_id, [item["id"] for item in data["items"]])
+        self.assertIn("category", data["facets"])
+
+        response = requests.get(f"{API_URL}/menu/search", params={"q": "paneer", "max_price": 1})
+        self.assertNotIn(item_id, [item["id"] for item in response.json()["items"]])
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        response = requests.get(f"{API_URL}/menu/search", params={"q": "paneer"})
+        self.assertNotIn(item_id, [item["id"] for item in response.json()["items"]])
+        print("✅ Menu search test passed")
+    
+    def test_15_order_status_transitions(self):
+        """Test atomic order status transitions and the active orders list"""
+        item_id = self.test_03_create_menu_item()
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": "+91-9876543210",
+            "order_type": "takeout",
+            "items": [{"menu_item_id": item_id, "quantity": 1}]
+        }
+        order_id = requests.post(f"{API_URL}/orders", json=test_order).json()["id"]
+
+        response = requests.patch(f"{API_URL}/orders/{order_id}/status", json={"status": "confirmed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "confirmed")
+
+        # Skipping a step or repeating one is rejected
+        response = requests.patch(f"{API_URL}/orders/{order_id}/status", json={"status": "ready"})
+        self.assertEqual(response.status_code, 409)
+
+        response = requests.patch(
+            f"{API_URL}/orders/status", json={"order_ids": [order_id], "status": "preparing"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["updated"]), 1)
+
+        response = requests.get(f"{API_URL}/orders/active")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(order_id, [order["id"] for order in response.json()])
+        for order in response.json():
+            self.assertNotEqual(order["status"], "delivered")
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Order status transition test passed")
+    
+    def test_16_idempotent_create_order(self):
+        """Test that retries with the same Idempotency-Key create one order"""
+        item_id = self.test_03_create_menu_item()
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": "+91-9876543210",
+            "order_type": "takeout",
+            "items": [{"menu_item_id": item_id, "quantity": 1}]
+        }
+        headers = {"Idempotency-Key": f"test-{item_id}"}
+        first = requests.post(f"{API_URL}/orders", json=test_order, headers=headers)
+        retry = requests.post(f"{API_URL}/orders", json=test_order, headers=headers)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(first.json()["id"], retry.json()["id"])
+        self.assertEqual(retry.headers.get("Idempotent-Replayed"), "true")
+
+        test_order["customer_name"] = "Someone Else"
+        response = requests.post(f"{API_URL}/orders", json=test_order, headers=headers)
+        self.assertEqual(response.status_code, 422)
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Idempotent order creation test passed")
+    
+    def test_17_order_line_snapshots(self):
+        """Test that orders keep the name and price at the time of ordering"""
+        item_id = self.test_03_create_menu_item()
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": "+91-9876543210",
+            "order_type": "takeout",
+            "items": [{"menu_item_id": item_id, "quantity": 2}]
+        }
+        order = requests.post(f"{API_URL}/orders", json=test_order).json()
+        self.assertEqual(order["items"][0]["name"], "Paneer Tikka")
+        self.assertEqual(order["items"][0]["unit_price"], 250.0)
+        self.assertEqual(order["items"][0]["line_total"], 500.0)
+
+        updated_item = {
+            "name": "Paneer Tikka",
+            "description": "Marinated cottage cheese cubes grilled to perfection",
+            "price": 300.0,
+            "category": "appetizers"
+        }
+        requests.put(f"{API_URL}/menu/{item_id}", json=updated_item)
+        order = requests.get(f"{API_URL}/orders/{order['id']}").json()
+        self.assertEqual(order["items"][0]["unit_price"], 250.0)
+
+        response = requests.get(f"{API_URL}/analytics/daily-summary")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(len(response.json()), 1)
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Order line snapshot test passed")
+
+    def test_18_sales_analytics(self):
+        """Test the aggregation-backed sales analytics endpoints"""
+        response = requests.get(f"{API_URL}/analytics/revenue", params={"granularity": "hour"})
+        self.assertEqual(response.status_code, 200)
+        for bucket in response.json():
+            self.assertIn("revenue", bucket)
+            self.assertIn("order_count", bucket)
+
+        response = requests.get(f"{API_URL}/analytics/best-sellers", params={"limit": 3})
+        self.assertEqual(response.status_code, 200)
+        for group in response.json():
+            self.assertLessEqual(len(group["items"]), 3)
+
+        response = requests.get(f"{API_URL}/analytics/ticket-size")
+        self.assertEqual(response.status_code, 200)
+        for row in response.json():
+            self.assertIn(row["order_type"], ["takeout", "delivery", "catering"])
+
+        response = requests.get(
+            f"{API_URL}/analytics/ticket-size", params={"date_from": "2024-02-01", "date_to": "2024-01-01"}
+        )
+        self.assertEqual(response.status_code, 400)
+        print("✅ Sales analytics test passed")
+
+    def test_19_order_rate_limit(self):
+        """Test that bursts of orders from one phone get 429 with Retry-After"""
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": f"+91-{uuid.uuid4().int % 10**10:010d}",
+            "order_type": "takeout",
+            # Unknown items are rejected after the rate limit check, so no orders are stored
+            "items": [{"menu_item_id": "does-not-exist", "quantity": 1}]
+        }
+        statuses = []
+        for _ in range(100):
+            response = requests.post(f"{API_URL}/orders", json=test_order)
+            statuses.append(response.status_code)
+            if response.status_code == 429:
+                self.assertIn("Retry-After", response.headers)
+                break
+        self.assertEqual(statuses[0], 400)
+        self.assertEqual(statuses[-1], 429)
+
+        # Retrying an already placed order replays it instead of spending a token
+        item_id = self.test_03_create_menu_item()
+        placed = {**test_order, "items": [{"menu_item_id": item_id, "quantity": 1}]}
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        time.sleep(int(response.headers["Retry-After"]))
+        response = requests.post(f"{API_URL}/orders", json=placed, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        while requests.post(f"{API_URL}/orders", json=test_order).status_code != 429:
+            pass
+        response = requests.post(f"{API_URL}/orders", json=placed, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get("Idempotent-Replayed"), "true")
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Order rate limit test passed")
+
+    def test_20_order_ready_estimate(self):
+        """Test that new orders get an estimated ready time from the kitchen queue"""
+        item_id = self.test_03_create_menu_item()
+        test_order = {
+            "customer_name": "Rahul Sharma",
+            "customer_phone": "+91-9876543210",
+            "order_type": "takeout",
+            "items": [{"menu_item_id": item_id, "quantity": 2}]
+        }
+        order = requests.post(f"{API_URL}/orders", json=test_order).json()
+        self.assertEqual(order["items"][0]["preparation_time"], 20)
+        self.assertIsNotNone(order["estimated_ready_at"])
+        self.assertGreater(order["estimated_ready_at"], order["created_at"])
+
+        response = requests.get(f"{API_URL}/kitchen/load")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.json()["active_orders"], 1)
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Order ready estimate test passed")
+
+    def test_21_bootstrap(self):
+        """Test the combined bootstrap endpoint and its unchanged reply"""
+        response = requests.get(f"{API_URL}/bootstrap")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["restaurant_info"]["name"], "Shriyansh Restaurant")
+        for category, items in data["menu"].items():
+            for item in items:
+                self.assertEqual(item["category"], category)
+
+        response = requests.get(f"{API_URL}/bootstrap", params={"version": data["version"]})
+        self.assertEqual(response.json(), {"version": data["version"], "unchanged": True})
+        print("✅ Bootstrap test passed")
+
+    def test_22_menu_item_image(self):
+        """Test image upload, resized variants and immutable image URLs"""
+        item_id = self.test_03_create_menu_item()
+        png = base64.b64decode(
+            "iVBORw0KGgoAAAANSUhEUgAAAAQAAAAECAIAAAAmkwkpAAAAEklEQVR4nGP838AAB0wMDMRwAEzRAYfB4XvhAAAAAElFTkSuQmCC"
+        )
+        response = requests.post(
+            f"{API_URL}/menu/{item_id}/image", files={"image": ("paneer.png", png, "image/png")}
+        )
+        self.assertEqual(response.status_code, 200)
+        item = response.json()
+        self.assertIn("thumb.webp", item["image_variants"])
+        self.assertEqual(item["image_url"], item["image_variants"]["card.webp"])
+
+        image_url = item["image_url"]
+        if image_url.startswith("/"):
+            image_url = BACKEND_URL + image_url
+        response = requests.get(image_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "image/webp")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+
+        response = requests.post(
+            f"{API_URL}/menu/{item_id}/image", files={"image": ("notes.txt", b"not an image", "text/plain")}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        # Dropping image_url through PUT must not leave the old variants behind
+        fields = {key: item[key] for key in ("name", "description", "price", "category")}
+        response = requests.put(f"{API_URL}/menu/{item_id}", json=fields)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["image_url"])
+        self.assertIsNone(response.json()["image_variants"])
+
+        requests.delete(f"{API_URL}/menu/{item_id}")
+        print("✅ Menu item image test passed")
+
+    def test_23_orders_created_range_with_offset(self):
+        """Test filtering orders by a timezone-aware created_at range"""
+        response = requests.get(f"{API_URL}/orders", params={"created_from": "2020-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, 200)
+        response = requests.get(f"{API_URL}/orders", params={"created_to": "2020-01-01T05:30:00+05:30"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+        print("✅ Order created_at range test passed")
 
 if __name__ == "__main__":
     # Run the tests in order
@@ -6,6 +6,51 @@ import { Phone, Mail, MapPin, Clock, Star, Utensils, ChefHat, Truck } from "luci
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const BOOTSTRAP_STORAGE_KEY = "restaurant-bootstrap";
+
+// Last /api/bootstrap payload, so repeat visits render before the network answers
+const loadStoredBootstrap = () => {
+  try {
+    return JSON.parse(localStorage.getItem(BOOTSTRAP_STORAGE_KEY));
+  } catch (err) {
+    return null;
+  }
+};
+
+const storeBootstrap = (data) => {
+  try {
+    localStorage.setItem(BOOTSTRAP_STORAGE_KEY, JSON.stringify(data));
+  } catch (err) {
+    // Storage full or disabled; we just refetch next time
+  }
+};
+
+// Image URLs from local storage are relative to the backend
+const imageUrl = (url) => (url && url.startsWith("/") ? `${BACKEND_URL}${url}` : url);
+
+// Resized photo of a menu item: WebP where supported, JPEG otherwise
+const MenuItemImage = ({ item }) => {
+  const variants = item.image_variants;
+  if (!variants) {
+    return item.image_url ? (
+      <img src={imageUrl(item.image_url)} alt={item.name} loading="lazy" className="w-full h-48 object-cover rounded-md mb-4" />
+    ) : null;
+  }
+  const srcSet = (ext) => `${imageUrl(variants[`thumb.${ext}`])} 320w, ${imageUrl(variants[`card.${ext}`])} 640w`;
+  return (
+    <picture>
+      <source type="image/webp" srcSet={srcSet("webp")} sizes="(min-width: 768px) 50vw, 100vw" />
+      <img
+        src={imageUrl(variants["card.jpg"])}
+        srcSet={srcSet("jpg")}
+        sizes="(min-width: 768px) 50vw, 100vw"
+        alt={item.name}
+        loading="lazy"
+        className="w-full h-48 object-cover rounded-md mb-4"
+      />
+    </picture>
+  );
+};
 
 // Menu Category Component
 const MenuCategory = ({ category, items, categoryNames }) => (
@@ -16,6 +61,7 @@ const MenuCategory = ({ category, items, categoryNames }) => (
     <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
       {items.map((item) => (
         <div key={item.id} className="bg-white rounded-lg shadow-md p-6 hover:shadow-lg transition-shadow">
+          <MenuItemImage item={item} />
           <div className="flex justify-between items-start mb-3">
             <div className="flex-1">
               <h4 className="text-lg font-semibold text-gray-800 mb-2 flex items-center">
@@ -237,7 +283,7 @@ const Footer = () => (
 
 // Main Home Component
 const Home = () => {
-  const [menuItems, setMenuItems] = useState([]);
+  const [groupedMenu, setGroupedMenu] = useState({});
   const [restaurantInfo, setRestaurantInfo] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -252,20 +298,35 @@ const Home = () => {
     snacks: "🍴 Snacks"
   };
 
+  const applyBootstrap = (data) => {
+    setGroupedMenu(data.menu);
+    setRestaurantInfo(data.restaurant_info);
+  };
+
   const fetchData = async () => {
-    try {
+    const stored = loadStoredBootstrap();
+    if (stored) {
+      applyBootstrap(stored);
+      setLoading(false);
+    } else {
       setLoading(true);
-      const [menuResponse, infoResponse] = await Promise.all([
-        axios.get(`${API}/menu`),
-        axios.get(`${API}/restaurant-info`)
-      ]);
-      
-      setMenuItems(menuResponse.data);
-      setRestaurantInfo(infoResponse.data);
+    }
+
+    try {
+      // One request for info and menu; "unchanged" if our stored copy is current
+      const response = await axios.get(`${API}/bootstrap`, {
+        params: stored ? { version: stored.version } : {}
+      });
+      if (!response.data.unchanged) {
+        applyBootstrap(response.data);
+        storeBootstrap(response.data);
+      }
       setError(null);
     } catch (err) {
       console.error("Error fetching data:", err);
-      setError("Failed to load restaurant data. Please try again later.");
+      if (!stored) {
+        setError("Failed to load restaurant data. Please try again later.");
+      }
     } finally {
       setLoading(false); 
     }
@@ -302,15 +363,6 @@ const Home = () => {
     );
   }
 
-  // Group menu items by category
-  const groupedMenu = menuItems.reduce((acc, item) => {
-    if (!acc[item.category]) {
-      acc[item.category] = [];
-    }
-    acc[item.category].push(item);
-    return acc;
-  }, {});
-
   return (
     <div className="min-h-screen bg-gray-50">
       <Header />
@@ -0,0 +1,28 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from compression import SUPPORTED_ENCODINGS, preferred_encoding  # noqa: E402
+
+
+class TestPreferredEncoding(unittest.TestCase):
+
+    def test_highest_quality_wins(self):
+        self.assertEqual(preferred_encoding("gzip;q=1.0, br;q=0.1"), "gzip")
+        self.assertEqual(preferred_encoding("br;q=0, gzip;q=0.5"), "gzip")
+
+    def test_server_order_breaks_ties(self):
+        self.assertEqual(preferred_encoding("gzip, br"), SUPPORTED_ENCODINGS[0])
+        self.assertEqual(preferred_encoding("*"), SUPPORTED_ENCODINGS[0])
+
+    def test_nothing_acceptable(self):
+        self.assertIsNone(preferred_encoding(None))
+        self.assertIsNone(preferred_encoding("deflate"))
+        self.assertIsNone(preferred_encoding("*;q=0"))
+        self.assertIsNone(preferred_encoding("identity;q=1, gzip;q=0.5"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from idempotency import IdempotencyStore  # noqa: E402
+
+
+class FakeKeys:
+    """Stands in for db.idempotency_keys; the first `failed_updates` update_one calls raise"""
+
+    def __init__(self, failed_updates=0):
+        self.documents = {}
+        self.failed_updates = failed_updates
+
+    def _matches(self, document, query):
+        return all(document.get(field) == value for field, value in query.items())
+
+    async def insert_one(self, document):
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate key")
+        self.documents[document["_id"]] = dict(document)
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        return dict(document) if document else None
+
+    async def update_one(self, query, update):
+        if self.failed_updates:
+            self.failed_updates -= 1
+            raise AutoReconnect("primary stepped down")
+        document = self.documents.get(query["_id"])
+        if document is None or not self._matches(document, query):
+            return SimpleNamespace(modified_count=0)
+        document.update(update["$set"])
+        return SimpleNamespace(modified_count=1)
+
+    async def delete_one(self, query):
+        document = self.documents.get(query["_id"])
+        if document and self._matches(document, query):
+            del self.documents[query["_id"]]
+
+
+class TestIdempotencyStore(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.placed = []
+
+    async def place(self):
+        self.placed.append(f"order-{len(self.placed) + 1}")
+        return {"id": self.placed[-1]}
+
+    async def test_replays_stored_response(self):
+        """A retry, on this worker or another, gets the first response back"""
+        keys = FakeKeys()
+        store = IdempotencyStore(keys)
+        self.assertEqual(await store.run("k", "hash", self.place), ({"id": "order-1"}, False))
+        self.assertEqual(await store.run("k", "hash", self.place), ({"id": "order-1"}, True))
+        other_worker = IdempotencyStore(keys)
+        self.assertEqual(await other_worker.run("k", "hash", self.place), ({"id": "order-1"}, True))
+        self.assertEqual(self.placed, ["order-1"])
+
+    async def test_failed_store_is_retried(self):
+        """A failed update_one after the order was placed does not fail the request"""
+        keys = FakeKeys(failed_updates=1)
+        store = IdempotencyStore(keys)
+        self.assertEqual(await store.run("k", "hash", self.place), ({"id": "order-1"}, False))
+        self.assertEqual(keys.documents["k"]["status"], "done")
+
+        other_worker = IdempotencyStore(keys, claim_timeout=0)
+        self.assertEqual(await other_worker.run("k", "hash", self.place), ({"id": "order-1"}, True))
+        self.assertEqual(self.placed, ["order-1"])
+
+    async def test_unstored_response_still_replays(self):
+        """Even if Mongo never records it, this worker replays the placed order"""
+        keys = FakeKeys(failed_updates=3)
+        store = IdempotencyStore(keys, claim_timeout=0)
+        with self.assertLogs("idempotency", "ERROR"):
+            self.assertEqual(await store.run("k", "hash", self.place), ({"id": "order-1"}, False))
+        self.assertEqual(await store.run("k", "hash", self.place), ({"id": "order-1"}, True))
+        self.assertEqual(self.placed, ["order-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
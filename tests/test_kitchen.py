@@ -0,0 +1,45 @@
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from kitchen import KitchenSchedule  # noqa: E402
+
+NOW = datetime(2024, 1, 1, 12, 0)
+LINES = [{"quantity": 1, "preparation_time": 20}]
+
+
+def order(order_id, minutes_ago):
+    return {"id": order_id, "items": LINES, "created_at": NOW - timedelta(minutes=minutes_ago)}
+
+
+class TestKitchenSchedule(unittest.TestCase):
+
+    def test_rebuild_drops_finished_orders(self):
+        kitchen = KitchenSchedule(stations=1)
+        kitchen.rebuild([order("old", 120), order("cooking", 10)], NOW)
+        self.assertEqual(kitchen.active_orders, 1)
+        self.assertEqual(kitchen.backlog(NOW), timedelta(minutes=10))
+
+    def test_rebuild_keeps_changes_made_during_the_query(self):
+        """Orders scheduled or completed while the resync query runs are not lost"""
+        kitchen = KitchenSchedule(stations=1)
+        kitchen.schedule("done", LINES, NOW - timedelta(minutes=5))
+        kitchen.begin_rebuild()
+        fetched = [order("done", 5), order("cooking", 10)]
+        kitchen.schedule("new", LINES, NOW)
+        kitchen.complete("done", NOW)
+        kitchen.rebuild(fetched, NOW)
+
+        self.assertEqual(kitchen.active_orders, 2)
+        self.assertEqual(kitchen.backlog(NOW), timedelta(minutes=30))
+        # Recording stops with the rebuild
+        kitchen.schedule("later", LINES, NOW)
+        kitchen.rebuild([], NOW)
+        self.assertEqual(kitchen.active_orders, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
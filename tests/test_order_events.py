@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+from pymongo.errors import OperationFailure
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from order_events import OrderEventHub  # noqa: E402
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+class FakeStream:
+    """A change stream that opens on the first read, like Motor's"""
+
+    def __init__(self, changes, error=None):
+        self.changes = list(changes)
+        self.error = error
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def try_next(self):
+        if self.error:
+            raise self.error
+        if not self.changes:
+            return None
+        self.resume_token = {"_data": len(self.changes)}
+        return self.changes.pop(0)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.changes:
+            await asyncio.sleep(0.01)
+        return await self.try_next()
+
+
+class FakeOrders:
+    """Stands in for db.orders; every watch() returns the same stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def watch(self, pipeline, **kwargs):
+        return self.stream
+
+
+class TestOrderEventHub(unittest.IsolatedAsyncioTestCase):
+
+    def test_resume_from_buffer(self):
+        hub = OrderEventHub(buffer_size=3)
+        first = hub.publish("order.created", {"id": "a"})
+        self.assertEqual(first.id, f"{hub.epoch}-1")
+        hub.publish("order.updated", {"id": "a"})
+        hub.publish("order.created", {"id": "b"})
+
+        subscription, complete = hub.subscribe(first.id)
+        self.assertTrue(complete)
+        self.assertEqual([event.seq for event in drain(subscription)], [2, 3])
+
+        subscription, complete = hub.subscribe(f"{hub.epoch}-3")
+        self.assertTrue(complete)
+        self.assertEqual(drain(subscription), [])
+
+    def test_gap_beyond_buffer(self):
+        """Missed events that were dropped from the buffer ask for a refetch"""
+        hub = OrderEventHub(buffer_size=2)
+        for index in range(4):
+            hub.publish("order.created", {"id": str(index)})
+
+        subscription, complete = hub.subscribe(f"{hub.epoch}-1")
+        self.assertFalse(complete)
+        self.assertEqual([event.seq for event in drain(subscription)], [3, 4])
+
+    def test_foreign_ids_reset(self):
+        """Ids from another worker or restart, bare numbers and future ids are not trusted"""
+        hub = OrderEventHub()
+        hub.publish("order.created", {"id": "a"})
+        for event_id in ("0123456789ab-1", "500", f"{hub.epoch}-2", f"{hub.epoch}-x"):
+            subscription, complete = hub.subscribe(event_id)
+            self.assertFalse(complete, event_id)
+            self.assertEqual(drain(subscription), [])
+
+    async def test_notify_until_change_stream_opens(self):
+        """Without a replica set the watcher fails and handlers keep publishing"""
+        hub = OrderEventHub()
+        orders = FakeOrders(FakeStream([], error=OperationFailure("not a replica set")))
+        task = asyncio.create_task(hub.watch_changes(orders, retry_delay=60))
+        self.addCleanup(task.cancel)
+        with self.assertLogs("order_events", "ERROR"):
+            await asyncio.sleep(0.01)
+
+        self.assertFalse(hub.uses_change_stream)
+        hub.notify("order.created", {"id": "a"})
+        self.assertEqual(hub.last_id, 1)
+
+    async def test_change_stream_replaces_notify(self):
+        hub = OrderEventHub()
+        stream = FakeStream([{"operationType": "insert", "fullDocument": {"_id": 1, "id": "a"}}])
+        task = asyncio.create_task(hub.watch_changes(FakeOrders(stream)))
+        self.addCleanup(task.cancel)
+        while not hub.uses_change_stream:
+            await asyncio.sleep(0.01)
+
+        hub.notify("order.created", {"id": "a"})
+        self.assertEqual([(event.type, event.order) for event in hub.buffer], [("order.created", {"id": "a"})])
+        self.assertIsNotNone(hub.resume_token)
+
+        stream.changes.append({"operationType": "update", "fullDocument": {"id": "a", "status": "ready"}})
+        while hub.last_id < 2:
+            await asyncio.sleep(0.01)
+        self.assertEqual(hub.buffer[-1].type, "order.updated")
+
+
+if __name__ == "__main__":
+    unittest.main()
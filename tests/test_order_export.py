@@ -0,0 +1,61 @@
+import csv
+import io
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from order_export import CSV_COLUMNS, csv_line  # noqa: E402
+
+
+def make_order(**fields):
+    order = {
+        "id": "order-1",
+        "created_at": datetime(2024, 1, 1, 12, 30),
+        "status": "pending",
+        "order_type": "delivery",
+        "customer_name": "Rahul Sharma",
+        "customer_phone": "9876543210",
+        "customer_email": "rahul@example.com",
+        "total_amount": 250.0,
+        "items": [{"menu_item_id": "app-001", "quantity": 2}],
+        "delivery_address": "12 MG Road",
+        "special_notes": "",
+    }
+    order.update(fields)
+    return order
+
+
+def parse(line):
+    return dict(zip(CSV_COLUMNS, next(csv.reader(io.StringIO(line)))))
+
+
+class TestCsvExport(unittest.TestCase):
+
+    def test_plain_row(self):
+        row = parse(csv_line(make_order()))
+        self.assertEqual(row["customer_name"], "Rahul Sharma")
+        self.assertEqual(row["items"], "app-001 x2")
+        self.assertEqual(row["created_at"], "2024-01-01T12:30:00")
+
+    def test_formulas_are_quoted(self):
+        """Customer text that a spreadsheet would evaluate is prefixed with '"""
+        row = parse(csv_line(make_order(
+            customer_name='=HYPERLINK("http://evil.example","click")',
+            customer_phone="+91-9876543210",
+            customer_email="@SUM(A1:A9)",
+            delivery_address="-2+3",
+            special_notes="\tcmd",
+        )))
+        self.assertEqual(row["customer_name"], '\'=HYPERLINK("http://evil.example","click")')
+        self.assertEqual(row["customer_phone"], "'+91-9876543210")
+        self.assertEqual(row["customer_email"], "'@SUM(A1:A9)")
+        self.assertEqual(row["delivery_address"], "'-2+3")
+        self.assertEqual(row["special_notes"], "'\tcmd")
+        self.assertEqual(row["status"], "pending")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from order_journal import DUPLICATE_KEY, OrderJournal, matches  # noqa: E402
+
+
+def decode(order):
+    return {**order, "created_at": datetime.fromisoformat(order["created_at"])}
+
+
+def make_order(order_id, minute=0):
+    return {"id": order_id, "status": "pending", "created_at": datetime(2024, 1, 1, 12, minute)}
+
+
+class FakeOrders:
+    """Stands in for db.orders; `duplicates` ids are reported as already stored"""
+
+    def __init__(self, duplicates=()):
+        self.documents = []
+        self.duplicates = set(duplicates)
+
+    async def insert_many(self, documents, ordered=True):
+        errors = []
+        for index, document in enumerate(documents):
+            if document["id"] in self.duplicates:
+                errors.append({"index": index, "code": DUPLICATE_KEY})
+            else:
+                self.documents.append(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+class TestOrderJournal(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def open_journal(self):
+        journal = OrderJournal(self.directory.name, decode=decode)
+        journal.open()
+        self.addCleanup(journal.close)
+        return journal
+
+    async def flush(self, journal, collection):
+        """Run the journal until its pending orders are in `collection`; returns the ids reported"""
+        flushed = []
+        done = asyncio.Event()
+
+        async def on_flushed(orders):
+            flushed.extend(order["id"] for order in orders)
+            if not journal.pending:
+                done.set()
+
+        task = asyncio.create_task(journal.run(collection, on_flushed=on_flushed))
+        try:
+            await asyncio.wait_for(done.wait(), timeout=5)
+            while journal._writer:
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+        return flushed
+
+    async def test_replay_pending_orders(self):
+        """Orders not marked flushed are loaded again on open; a torn tail is ignored"""
+        journal = self.open_journal()
+        await journal.append(make_order("a", 1))
+        await journal.append(make_order("b", 2))
+        await journal._mark_flushed(["a"])
+        with open(journal.path, "ab") as file:
+            file.write(b'{"order": {"id": "torn"')
+        journal.close()
+
+        replayed = self.open_journal()
+        self.assertEqual(replayed.path, journal.path)
+        self.assertEqual(list(replayed.pending), ["b"])
+        self.assertEqual(replayed.pending["b"]["created_at"], datetime(2024, 1, 1, 12, 2))
+
+    async def test_flush_to_collection(self):
+        """run() inserts pending orders, reports them and truncates the file"""
+        journal = self.open_journal()
+        await journal.append(make_order("a", 1))
+        await journal.append(make_order("b", 2))
+
+        orders = FakeOrders()
+        flushed = await self.flush(journal, orders)
+
+        self.assertEqual(flushed, ["a", "b"])
+        self.assertEqual([order["id"] for order in orders.documents], ["a", "b"])
+        self.assertEqual(journal.pending, {})
+        self.assertEqual(os.path.getsize(journal.path), 0)
+
+    async def test_flush_skips_duplicates(self):
+        """Orders already in Mongo (flushed before a crash) are dropped, not retried"""
+        journal = self.open_journal()
+        await journal.append(make_order("a", 1))
+        await journal.append(make_order("b", 2))
+
+        orders = FakeOrders(duplicates={"a"})
+        flushed = await self.flush(journal, orders)
+
+        self.assertEqual(flushed, ["b"])
+        self.assertEqual(journal.pending, {})
+
+    async def test_flusher_survives_failed_marker(self):
+        """A failed write of the "flushed" record does not stop later flushes"""
+        journal = self.open_journal()
+        write_lines = journal._write_lines
+        failures = []
+
+        def fail_first_marker(lines):
+            if not failures and b"flushed" in lines[0]:
+                failures.append(lines)
+                raise OSError("disk full")
+            write_lines(lines)
+
+        journal._write_lines = fail_first_marker
+        orders = FakeOrders()
+        task = asyncio.create_task(journal.run(orders))
+        self.addCleanup(task.cancel)
+        with self.assertLogs("order_journal", "ERROR"):
+            await journal.append(make_order("a", 1))
+            self.assertTrue(await journal.wait_flushed("a", timeout=5))
+            while not failures:
+                await asyncio.sleep(0.01)
+        await journal.append(make_order("c", 3))
+
+        self.assertTrue(await journal.wait_flushed("c", timeout=5))
+        self.assertFalse(task.done())
+        self.assertEqual([order["id"] for order in orders.documents], ["a", "c"])
+
+    async def test_find_sibling(self):
+        """Pending orders of another worker's journal can be looked up by id"""
+        first = self.open_journal()
+        second = self.open_journal()
+        self.assertNotEqual(first.path, second.path)
+        await first.append(make_order("a", 1))
+        await first.append(make_order("b", 2))
+        await first._mark_flushed(["a"])
+
+        self.assertIsNone(await second.find_sibling("a"))
+        self.assertEqual((await second.find_sibling("b"))["created_at"], datetime(2024, 1, 1, 12, 2))
+        self.assertIsNone(await first.find_sibling("b"))
+
+    def test_matches_filters(self):
+        """The filter subset used by the order routes"""
+        order = make_order("b", 30)
+        self.assertTrue(matches(order, {"status": {"$in": ["pending", "confirmed"]}}))
+        self.assertTrue(matches(order, {"created_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 1, 2)}}))
+        self.assertFalse(matches(order, {"$or": [{"id": "a"}, {"created_at": {"$lt": datetime(2024, 1, 1)}}]}))
+
+
+if __name__ == "__main__":
+    unittest.main()